@@ -1,10 +1,12 @@
-from typing import List
-from rich.console import Console
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, ClassVar, List
+from rich.console import Console, Group, RenderableType
 from rich.table import Table
 from rich.panel import Panel
 from rich.text import Text
 
-from ..domain.entities import Resident, SearchResults, NoteType
+from ..domain.entities import Resident, SearchResults, NoteType, QueryResult
 from ..use_cases.interfaces import (
     SearchClinicalNotesUseCase, 
     GetResidentsUseCase, 
@@ -12,6 +14,18 @@ from ..use_cases.interfaces import (
 )
 
 
+# Shared console; Rich probes the terminal when a Console is constructed
+_CONSOLE = Console()
+
+_FILTER_CHIP_TEMPLATE = "[dim][[/dim][blue]{}[/blue][dim]][/dim]"
+
+# Rendered filter chip for every note type, in display order
+_FILTER_CHIPS = {
+    value: _FILTER_CHIP_TEMPLATE.format(value)
+    for value in sorted(note_type.value for note_type in NoteType)
+}
+
+
 class TalkToChartController:
     """Main controller for the Talk to Chart application."""
     
@@ -26,18 +40,40 @@ class TalkToChartController:
         self._get_residents_use_case = get_residents_use_case
         self._get_resident_use_case = get_resident_use_case
         self._presenter = presenter
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._residents_cache: tuple[List[Resident], dict[str, Resident]] | None = None
     
-    def get_residents(self) -> List[Resident]:
-        """Get all available residents."""
-        return self._get_residents_use_case.execute()
+    def get_residents(self, refresh: bool = False) -> List[Resident]:
+        """Get all available residents, reusing the last fetch unless refreshed."""
+        return self._cached_residents(refresh)[0]
+    
+    def find_resident(self, resident_id: str) -> Resident | None:
+        """Find a resident in the cached resident list."""
+        return self._cached_residents()[1].get(resident_id)
+    
+    def _cached_residents(
+        self,
+        refresh: bool = False
+    ) -> tuple[List[Resident], dict[str, Resident]]:
+        """Get the resident list and its ID index, fetching them when needed."""
+        if refresh or self._residents_cache is None:
+            residents = self._get_residents_use_case.execute()
+            self._residents_cache = (
+                residents,
+                {resident.id: resident for resident in residents}
+            )
+        return self._residents_cache
     
     def search_clinical_notes(self, resident_id: str, query: str) -> SearchResults:
         """Search clinical notes for a resident."""
+        # Resident info does not depend on the search, so fetch it alongside
+        resident_future = self._executor.submit(
+            self._get_resident_use_case.execute, resident_id
+        )
+        
         # Execute search
         results = self._search_use_case.execute(resident_id, query)
-        
-        # Get resident info to complete the results
-        resident = self._get_resident_use_case.execute(resident_id)
+        resident = resident_future.result()
         
         # Update results with resident info
         return SearchResults(
@@ -47,6 +83,64 @@ class TalkToChartController:
             summary=results.summary
         )
     
+    async def search_clinical_notes_async(
+        self,
+        resident_id: str,
+        query: str
+    ) -> SearchResults:
+        """Search clinical notes while fetching resident info concurrently."""
+        results, resident = await asyncio.gather(
+            self._search_use_case.execute_async(resident_id, query),
+            self._get_resident_use_case.execute_async(resident_id)
+        )
+        
+        return SearchResults(
+            query=results.query,
+            resident=resident,
+            results=results.results,
+            summary=results.summary
+        )
+    
+    def stream_clinical_notes(
+        self,
+        resident_id: str,
+        query: str,
+        on_result: Callable[[QueryResult], None]
+    ) -> SearchResults:
+        """Search clinical notes for a resident, passing results to on_result as they arrive."""
+        resident_future = self._executor.submit(
+            self._get_resident_use_case.execute, resident_id
+        )
+        
+        results = self._search_use_case.execute_stream(resident_id, query, on_result)
+        resident = resident_future.result()
+        
+        return SearchResults(
+            query=results.query,
+            resident=resident,
+            results=results.results,
+            summary=results.summary
+        )
+    
+    def search_clinical_notes_batch(
+        self,
+        resident_id: str,
+        queries: List[str]
+    ) -> List[SearchResults]:
+        """Search clinical notes for a resident with several queries at once."""
+        batch_results = self._search_use_case.execute_batch(resident_id, queries)
+        resident = self._get_resident_use_case.execute(resident_id)
+        
+        return [
+            SearchResults(
+                query=results.query,
+                resident=resident,
+                results=results.results,
+                summary=results.summary
+            )
+            for results in batch_results
+        ]
+    
     def display_residents(self, residents: List[Resident]) -> None:
         """Display available residents."""
         self._presenter.display_residents(residents)
@@ -59,8 +153,16 @@ class TalkToChartController:
 class TalkToChartPresenter:
     """Presenter for formatting and displaying application output."""
     
-    def __init__(self) -> None:
-        self.console = Console()
+    _NOTE_TYPE_COLORS: ClassVar[dict[NoteType, str]] = {
+        NoteType.NURSING: "green",
+        NoteType.THERAPY: "blue",
+        NoteType.CNA: "yellow",
+        NoteType.SOCIAL_WORK: "purple",
+        NoteType.PHYSICIAN: "red"
+    }
+    
+    def __init__(self, console: Console | None = None) -> None:
+        self.console = console or _CONSOLE
     
     def display_welcome(self) -> None:
         """Display welcome message."""
@@ -89,34 +191,71 @@ This tool helps you find specific clinical evidence from resident charts using n
                 resident.id,
                 resident.name,
                 resident.room_number,
-                resident.admission_date.strftime("%m/%d/%Y")
+                resident.admission_date_display
             )
         
         self.console.print(table)
     
     def display_search_results(self, results: SearchResults) -> None:
         """Display search results in a formatted, easy-to-scan layout."""
+        # The summary explains why: no notes, no matches or a failed search
         if not results.results:
-            self.console.print(f"\n[yellow]No results found for: '{results.query}'[/yellow]")
+            self.console.print(f"\n[yellow]{results.summary}[/yellow]")
             return
         
-        # Display header
-        self.console.print(f"\n[bold]Query:[/bold] {results.query}")
-        if results.resident:
-            self.console.print(f"[bold]Resident:[/bold] {results.resident}")
+        # Collect header, summary, results and filters into one renderable
+        renderables = self._build_search_header(results.query, results.resident)
         
-        # Display summary
-        self.console.print(f"\n[green]{results.summary}[/green]\n")
+        # Summary
+        renderables.append(f"\n[green]{results.summary}[/green]\n")
         
-        # Display each result
+        # Each result, followed by spacing
         for i, result in enumerate(results.results, 1):
-            self._display_single_result(i, result)
+            renderables.append(self._build_result_panel(i, result))
+            renderables.append("")
+        
+        # Filter options
+        filter_options = self._build_filter_options(results)
+        if filter_options:
+            renderables.append(filter_options)
         
-        # Display filter options
-        self._display_filter_options(results)
+        self.console.print(Group(*renderables))
     
-    def _display_single_result(self, index: int, result) -> None:
-        """Display a single search result."""
+    def display_partial_result(self, index: int, result: QueryResult) -> None:
+        """Display a single result as soon as it arrives from a streamed search."""
+        self.console.print(self._build_result_panel(index, result))
+        self.console.print()
+    
+    def display_search_header(self, query: str, resident: Resident | None) -> None:
+        """Display the query and resident before streamed results arrive."""
+        self.console.print(Group(*self._build_search_header(query, resident)))
+    
+    def display_stream_summary(self, results: SearchResults) -> None:
+        """Display the summary and filter options once a streamed search has finished."""
+        if not results.results:
+            self.console.print(f"\n[yellow]{results.summary}[/yellow]")
+            return
+        
+        renderables: List[RenderableType] = [f"[green]{results.summary}[/green]"]
+        filter_options = self._build_filter_options(results)
+        if filter_options:
+            renderables.append(filter_options)
+        
+        self.console.print(Group(*renderables))
+    
+    def _build_search_header(
+        self,
+        query: str,
+        resident: Resident | None
+    ) -> List[RenderableType]:
+        """Build the query and resident lines shown above search results."""
+        header: List[RenderableType] = [f"\n[bold]Query:[/bold] {query}"]
+        if resident:
+            header.append(f"[bold]Resident:[/bold] {resident}")
+        return header
+    
+    def _build_result_panel(self, index: int, result: QueryResult) -> Panel:
+        """Build the panel for a single search result."""
         # Create the quote panel
         quote_text = Text(result.quoted_snippet)
         quote_text.stylize("italic")
@@ -134,35 +273,29 @@ This tool helps you find specific clinical evidence from resident charts using n
         panel_title = f"Result {index}"
         color = self._get_note_type_color(result.source_note.note_type)
         
-        self.console.print(Panel(
+        return Panel(
             content,
             title=panel_title,
             border_style=color,
             padding=(0, 1)
-        ))
-        self.console.print()  # Add spacing
+        )
     
     def _get_note_type_color(self, note_type: NoteType) -> str:
         """Get color scheme for different note types."""
-        color_map = {
-            NoteType.NURSING: "green",
-            NoteType.THERAPY: "blue", 
-            NoteType.CNA: "yellow",
-            NoteType.SOCIAL_WORK: "purple",
-            NoteType.PHYSICIAN: "red"
-        }
-        return color_map.get(note_type, "white")
-    
-    def _display_filter_options(self, results: SearchResults) -> None:
-        """Display available filter options."""
-        note_types = set(result.source_note.note_type for result in results.results)
-        
-        if len(note_types) > 1:
-            filter_chips = " ".join([
-                f"[dim][[/dim][blue]{nt.value}[/blue][dim]][/dim]" 
-                for nt in sorted(note_types, key=lambda x: x.value)
-            ])
-            self.console.print(f"[dim]Filter by:[/dim] [blue][All][/blue] {filter_chips}")
+        return self._NOTE_TYPE_COLORS.get(note_type, "white")
+    
+    def _build_filter_options(self, results: SearchResults) -> str | None:
+        """Build the filter options line, or None when there is nothing to filter."""
+        note_type_values = {result.source_note.note_type.value for result in results.results}
+        
+        if len(note_type_values) <= 1:
+            return None
+        
+        filter_chips = " ".join([
+            chip for value, chip in _FILTER_CHIPS.items()
+            if value in note_type_values
+        ])
+        return f"[dim]Filter by:[/dim] [blue][All][/blue] {filter_chips}"
     
     def display_error(self, message: str) -> None:
         """Display error message."""
@@ -174,7 +307,7 @@ This tool helps you find specific clinical evidence from resident charts using n
     
     def prompt_resident_selection(self) -> str:
         """Prompt user to select a resident."""
-        return self.console.input("\n[bold]Enter Resident ID:[/bold] ")
+        return self.console.input("\n[bold]Enter Resident ID[/bold] [dim](r to refresh)[/dim][bold]:[/bold] ")
     
     def prompt_query(self, resident_name: str) -> str:
         """Prompt user for their query."""
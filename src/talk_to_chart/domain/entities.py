@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import List, Optional
 from enum import Enum
@@ -13,17 +13,22 @@ class NoteType(Enum):
     PHYSICIAN = "Physician"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Author:
     """Value object representing a clinical note author."""
     name: str
     title: str
+    _display: str = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self) -> None:
+        """Precompute the display string."""
+        object.__setattr__(self, "_display", f"{self.name}, {self.title}")
     
     def __str__(self) -> str:
-        return f"{self.name}, {self.title}"
+        return self._display
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ClinicalNote:
     """Entity representing a clinical note in the patient chart."""
     id: str
@@ -32,28 +37,41 @@ class ClinicalNote:
     note_type: NoteType
     author: Author
     created_at: datetime
+    source_description: str = field(init=False, repr=False, compare=False)
     
-    @property
-    def source_description(self) -> str:
-        """Get formatted source description for display."""
+    def __post_init__(self) -> None:
+        """Precompute the formatted source description for display."""
         date_str = self.created_at.strftime("%m/%d/%Y")
         time_str = self.created_at.strftime("%H:%M")
-        return f"Source: {self.note_type.value} Note, {self.author} — {date_str}, {time_str}"
+        object.__setattr__(
+            self,
+            "source_description",
+            f"Source: {self.note_type.value} Note, {self.author} — {date_str}, {time_str}"
+        )
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Resident:
     """Entity representing a nursing home resident."""
     id: str
     name: str
     room_number: str
     admission_date: datetime
+    admission_date_display: str = field(init=False, repr=False, compare=False)
+    _display: str = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self) -> None:
+        """Precompute the display strings."""
+        object.__setattr__(
+            self, "admission_date_display", self.admission_date.strftime("%m/%d/%Y")
+        )
+        object.__setattr__(self, "_display", f"{self.name} (Room {self.room_number})")
     
     def __str__(self) -> str:
-        return f"{self.name} (Room {self.room_number})"
+        return self._display
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class QueryResult:
     """Value object representing a search result snippet."""
     snippet: str
@@ -66,7 +84,7 @@ class QueryResult:
         return f'"{self.snippet}"'
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class SearchResults:
     """Aggregate representing the complete search results."""
     query: str
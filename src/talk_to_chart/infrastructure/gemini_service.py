@@ -1,18 +1,127 @@
+import hashlib
 import re
-from typing import List
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from operator import attrgetter
+from pathlib import Path
+from typing import Iterator, List, Tuple
 import google.generativeai as genai
+import numpy as np
 
 from ..domain.entities import ClinicalNote, QueryResult
-from ..use_cases.interfaces import AIQueryProcessor
+from ..use_cases.interfaces import AIQueryError, AIQueryProcessor
+from .semantic_cache import fingerprint_notes
+
+
+# Patterns for parsing the structured search response. Each "SNIPPET:" marker
+# starts an entry that runs until the next marker; within an entry the fields
+# are searched independently, so they may appear in any order.
+_SNIPPET_RE = re.compile(r'"([^"]+)"')
+_NOTE_ID_RE = re.compile(r'NOTE_ID:\s*NOTE_(\d+)')
+_RELEVANCE_RE = re.compile(r'RELEVANCE:\s*(\d+)')
+_QUERY_MARKER_RE = re.compile(r'===\s*QUERY_(\d+)\s*===')
+
+# Static parts of the search prompt. The notes context comes before the
+# instructions and the query last, so every query about the same chart shares
+# one long prompt prefix that Gemini can serve from its implicit prompt cache.
+_SEARCH_PROMPT_PREFIX = """
+You are an expert MDS coordinator assistant. Your task is to find relevant clinical evidence from nursing home documentation.
+
+CLINICAL NOTES:
+"""
+_SEARCH_PROMPT_SUFFIX = """
+
+Instructions:
+1. Find direct quotes from the clinical notes that are relevant to the query
+2. Return ONLY the most relevant sentences or phrases (not entire paragraphs)
+3. Include the NOTE_X identifier for each relevant snippet
+4. Format your response as:
+   SNIPPET: "exact quote from note"
+   NOTE_ID: NOTE_X
+   RELEVANCE: score from 1-10
+   
+5. Return up to 5 most relevant snippets
+6. Only include snippets that directly answer or relate to the query
+
+Response format:
+SNIPPET: "quote here"
+NOTE_ID: NOTE_0
+RELEVANCE: 8
+
+SNIPPET: "another quote"
+NOTE_ID: NOTE_2  
+RELEVANCE: 7
+
+QUERY: """
+
+# Static parts of the batched search prompt, ordered the same way
+_BATCH_PROMPT_PREFIX = """
+You are an expert MDS coordinator assistant. Your task is to find relevant clinical evidence from nursing home documentation for each of the queries listed at the end.
+
+CLINICAL NOTES:
+"""
+_BATCH_PROMPT_SUFFIX = """
+
+Instructions:
+1. Answer each query independently using the clinical notes
+2. Start the answer for each query with a line "=== QUERY_X ===" using its identifier
+3. Under each marker, find direct quotes from the clinical notes that are relevant to that query
+4. Return ONLY the most relevant sentences or phrases (not entire paragraphs)
+5. Format each snippet as:
+   SNIPPET: "exact quote from note"
+   NOTE_ID: NOTE_X
+   RELEVANCE: score from 1-10
+
+6. Return up to 5 most relevant snippets per query
+7. Leave a query's block empty if no snippets relate to it
+
+Response format:
+=== QUERY_0 ===
+SNIPPET: "quote here"
+NOTE_ID: NOTE_0
+RELEVANCE: 8
+
+=== QUERY_1 ===
+SNIPPET: "another quote"
+NOTE_ID: NOTE_2
+RELEVANCE: 7
+
+QUERIES:
+"""
+
+# Map common MDS-related terms
+_EVIDENCE_MAPPING = {
+    "depression": "symptoms of depression",
+    "mood": "mood-related symptoms",
+    "fall": "fall risk or incidents",
+    "assist": "assistance requirements",
+    "transfer": "transfer assistance needs",
+    "cognitive": "cognitive impairment",
+    "behavior": "behavioral symptoms",
+    "pain": "pain indicators",
+    "medication": "medication-related issues"
+}
+_EVIDENCE_PRIORITY = {keyword: rank for rank, keyword in enumerate(_EVIDENCE_MAPPING)}
+_EVIDENCE_RE = re.compile("|".join(map(re.escape, _EVIDENCE_MAPPING)))
 
 
 class GeminiQueryProcessor(AIQueryProcessor):
     """Gemini-powered implementation of AI query processing."""
     
-    def __init__(self, api_key: str, model_name: str = "gemini-2.5-flash") -> None:
+    def __init__(
+        self,
+        api_key: str,
+        model_name: str = "gemini-2.5-flash",
+        cache_size: int = 512
+    ) -> None:
         """Initialize Gemini AI service."""
         genai.configure(api_key=api_key)
         self.model = genai.GenerativeModel(model_name)
+        self._cache_size = cache_size
+        self._result_cache: "OrderedDict[Tuple[str, str], Tuple[QueryResult, ...]]" = OrderedDict()
+        # Note chunks of one search are queried from several threads at once
+        self._cache_lock = threading.Lock()
     
     def process_query(
         self, 
@@ -20,6 +129,12 @@ class GeminiQueryProcessor(AIQueryProcessor):
         clinical_notes: List[ClinicalNote]
     ) -> List[QueryResult]:
         """Process natural language query against clinical notes."""
+        # Identical queries against an unchanged chart skip the Gemini call
+        cache_key = self._cache_key(query, clinical_notes)
+        cached = self._lookup_exact(cache_key)
+        if cached is not None:
+            return cached
+        
         # Prepare context with all clinical notes
         context = self._prepare_context(clinical_notes)
         
@@ -28,10 +143,115 @@ class GeminiQueryProcessor(AIQueryProcessor):
         
         try:
             response = self.model.generate_content(prompt)
-            return self._parse_search_response(response.text, clinical_notes)
+            results = self._parse_search_response(response.text, clinical_notes)
+        except Exception as e:
+            raise AIQueryError(f"Gemini could not process the query: {e}") from e
+        
+        self._cache_results(cache_key, results)
+        return results
+    
+    async def process_query_async(
+        self,
+        query: str,
+        clinical_notes: List[ClinicalNote]
+    ) -> List[QueryResult]:
+        """Process a query without blocking the event loop on Gemini calls."""
+        cache_key = self._cache_key(query, clinical_notes)
+        cached = self._lookup_exact(cache_key)
+        if cached is not None:
+            return cached
+        
+        context = self._prepare_context(clinical_notes)
+        prompt = self._create_search_prompt(query, context)
+        
+        try:
+            response = await self.model.generate_content_async(prompt)
+            results = self._parse_search_response(response.text, clinical_notes)
+        except Exception as e:
+            raise AIQueryError(f"Gemini could not process the query: {e}") from e
+        
+        self._cache_results(cache_key, results)
+        return results
+    
+    def process_query_stream(
+        self,
+        query: str,
+        clinical_notes: List[ClinicalNote]
+    ) -> Iterator[QueryResult]:
+        """Yield results as Gemini streams them back, in response order."""
+        cache_key = self._cache_key(query, clinical_notes)
+        cached = self._lookup_exact(cache_key)
+        if cached is not None:
+            yield from cached
+            return
+        
+        context = self._prepare_context(clinical_notes)
+        prompt = self._create_search_prompt(query, context)
+        
+        response_text = ""
+        parsed_up_to = 0
+        results: List[QueryResult] = []
+        try:
+            for chunk in self.model.generate_content(prompt, stream=True):
+                response_text += chunk.text
+                
+                # An entry is complete once the next entry's marker has arrived
+                complete_up_to = response_text.rfind("SNIPPET:")
+                if complete_up_to <= parsed_up_to:
+                    continue
+                for result in self._iter_search_results(
+                    response_text[parsed_up_to:complete_up_to], clinical_notes
+                ):
+                    results.append(result)
+                    yield result
+                parsed_up_to = complete_up_to
         except Exception as e:
-            print(f"Error processing query with Gemini: {e}")
-            return []
+            raise AIQueryError(f"Gemini could not process the query: {e}") from e
+        
+        for result in self._iter_search_results(response_text[parsed_up_to:], clinical_notes):
+            results.append(result)
+            yield result
+        
+        results.sort(key=attrgetter("relevance_score"), reverse=True)
+        self._cache_results(cache_key, results)
+    
+    def process_queries(
+        self,
+        queries: List[str],
+        clinical_notes: List[ClinicalNote]
+    ) -> List[List[QueryResult]]:
+        """Process several queries against the same notes in one Gemini call."""
+        notes_key = fingerprint_notes(clinical_notes)
+        cache_keys = [(query.strip().lower(), notes_key) for query in queries]
+        
+        # Only queries without cached results are sent to Gemini
+        batch_results = [self._lookup_exact(cache_key) for cache_key in cache_keys]
+        pending = [i for i, results in enumerate(batch_results) if results is None]
+        
+        if pending:
+            context = self._prepare_context(clinical_notes)
+            prompt = self._create_batch_search_prompt(
+                [queries[i] for i in pending],
+                context
+            )
+            
+            try:
+                response = self.model.generate_content(prompt)
+                blocks = self._split_batch_response(response.text, len(pending))
+            except Exception as e:
+                raise AIQueryError(f"Gemini could not process the queries: {e}") from e
+            
+            for position, i in enumerate(pending):
+                # A query Gemini skipped is answered empty but not cached
+                block = blocks[position]
+                if block is None:
+                    batch_results[i] = []
+                    continue
+                results = self._parse_search_response(block, clinical_notes)
+                self._cache_results(cache_keys[i], results)
+                batch_results[i] = results
+        
+        return [results or [] for results in batch_results]
     
     def generate_summary(self, query: str, results: List[QueryResult]) -> str:
         """Generate a summary of the search results."""
@@ -46,11 +266,47 @@ class GeminiQueryProcessor(AIQueryProcessor):
         else:
             return f"I found {count} relevant notes for your query:"
     
+    def _cache_key(
+        self,
+        query: str,
+        clinical_notes: List[ClinicalNote]
+    ) -> Tuple[str, str]:
+        """Build the result cache key for a query against a set of notes."""
+        return query.strip().lower(), fingerprint_notes(clinical_notes)
+    
+    def _lookup_exact(self, cache_key: Tuple[str, str]) -> List[QueryResult] | None:
+        """Return cached results for an identical query, if any."""
+        with self._cache_lock:
+            cached = self._result_cache.get(cache_key)
+            if cached is None:
+                return None
+            self._result_cache.move_to_end(cache_key)
+            return list(cached)
+    
+    def _cache_results(
+        self,
+        cache_key: Tuple[str, str],
+        results: List[QueryResult]
+    ) -> None:
+        """Store query results, evicting the least recently used entry when full."""
+        with self._cache_lock:
+            self._result_cache[cache_key] = tuple(results)
+            self._result_cache.move_to_end(cache_key)
+            if len(self._result_cache) > self._cache_size:
+                self._result_cache.popitem(last=False)
+    
     def _prepare_context(self, clinical_notes: List[ClinicalNote]) -> str:
         """Prepare clinical notes as context for the AI model."""
-        context_parts = []
+        return self._render_context(tuple(clinical_notes))
+    
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def _render_context(clinical_notes: Tuple[ClinicalNote, ...]) -> str:
+        """Render notes into prompt context, reused while a chart is unchanged."""
+        context_parts: List[str] = []
+        append = context_parts.append
         for i, note in enumerate(clinical_notes):
-            context_parts.append(
+            append(
                 f"NOTE_{i}:\n"
                 f"Type: {note.note_type.value}\n"
                 f"Author: {note.author}\n"
@@ -62,101 +318,173 @@ class GeminiQueryProcessor(AIQueryProcessor):
     
     def _create_search_prompt(self, query: str, context: str) -> str:
         """Create a prompt for finding relevant clinical evidence."""
-        return f"""
-You are an expert MDS coordinator assistant. Your task is to find relevant clinical evidence from nursing home documentation.
-
-QUERY: {query}
-
-CLINICAL NOTES:
-{context}
-
-Instructions:
-1. Find direct quotes from the clinical notes that are relevant to the query
-2. Return ONLY the most relevant sentences or phrases (not entire paragraphs)
-3. Include the NOTE_X identifier for each relevant snippet
-4. Format your response as:
-   SNIPPET: "exact quote from note"
-   NOTE_ID: NOTE_X
-   RELEVANCE: score from 1-10
-   
-5. Return up to 5 most relevant snippets
-6. Only include snippets that directly answer or relate to the query
-
-Response format:
-SNIPPET: "quote here"
-NOTE_ID: NOTE_0
-RELEVANCE: 8
-
-SNIPPET: "another quote"
-NOTE_ID: NOTE_2  
-RELEVANCE: 7
-"""
-
+        return self._search_prompt_head(context) + query
+    
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def _search_prompt_head(context: str) -> str:
+        """Build everything in the search prompt before the query, once per context."""
+        return "".join((_SEARCH_PROMPT_PREFIX, context, _SEARCH_PROMPT_SUFFIX))
+    
+    def _create_batch_search_prompt(self, queries: List[str], context: str) -> str:
+        """Create a prompt that answers several queries against one notes context."""
+        query_lines = "\n".join(
+            f"QUERY_{i}: {query}" for i, query in enumerate(queries)
+        )
+        return "".join((_BATCH_PROMPT_PREFIX, context, _BATCH_PROMPT_SUFFIX, query_lines))
+    
+    def _split_batch_response(
+        self,
+        response_text: str,
+        query_count: int
+    ) -> List[str | None]:
+        """Split a batched response into one block of text per query, None where missing."""
+        blocks: List[str | None] = [None] * query_count
+        markers = list(_QUERY_MARKER_RE.finditer(response_text))
+        for i, marker in enumerate(markers):
+            query_index = int(marker.group(1))
+            if query_index >= query_count:
+                continue
+            end = markers[i + 1].start() if i + 1 < len(markers) else len(response_text)
+            blocks[query_index] = response_text[marker.end():end]
+        return blocks
+    
     def _parse_search_response(
         self, 
         response_text: str, 
         clinical_notes: List[ClinicalNote]
     ) -> List[QueryResult]:
         """Parse Gemini response into QueryResult objects."""
-        results = []
-        
-        # Split response into sections
-        sections = response_text.split("SNIPPET:")
-        
-        for section in sections[1:]:  # Skip first empty section
-            try:
-                # Extract snippet text (between quotes)
-                snippet_match = re.search(r'"([^"]+)"', section)
-                if not snippet_match:
-                    continue
-                snippet = snippet_match.group(1)
-                
-                # Extract note ID
-                note_id_match = re.search(r'NOTE_ID:\s*NOTE_(\d+)', section)
-                if not note_id_match:
-                    continue
-                note_index = int(note_id_match.group(1))
-                
-                # Extract relevance score
-                relevance_match = re.search(r'RELEVANCE:\s*(\d+)', section)
-                relevance_score = float(relevance_match.group(1)) / 10.0 if relevance_match else 0.5
-                
-                # Validate note index
-                if note_index >= len(clinical_notes):
-                    continue
-                
-                results.append(QueryResult(
-                    snippet=snippet,
-                    source_note=clinical_notes[note_index],
-                    relevance_score=relevance_score
-                ))
-                
-            except (ValueError, IndexError, AttributeError):
-                continue
+        results = list(self._iter_search_results(response_text, clinical_notes))
         
         # Sort by relevance score (highest first)
-        results.sort(key=lambda x: x.relevance_score, reverse=True)
+        results.sort(key=attrgetter("relevance_score"), reverse=True)
         return results
     
-    def _extract_evidence_type(self, query: str) -> str | None:
+    def _iter_search_results(
+        self,
+        response_text: str,
+        clinical_notes: List[ClinicalNote]
+    ) -> Iterator[QueryResult]:
+        """Yield a QueryResult for each snippet entry, in response order."""
+        # Split response into entries, skipping the text before the first marker
+        for section in response_text.split("SNIPPET:")[1:]:
+            snippet_match = _SNIPPET_RE.search(section)
+            if not snippet_match:
+                continue
+            
+            note_id_match = _NOTE_ID_RE.search(section)
+            if not note_id_match:
+                continue
+            note_index = int(note_id_match.group(1))
+            
+            # Validate note index
+            if note_index >= len(clinical_notes):
+                continue
+            
+            relevance_match = _RELEVANCE_RE.search(section)
+            relevance_score = float(relevance_match.group(1)) / 10.0 if relevance_match else 0.5
+            
+            yield QueryResult(
+                snippet=snippet_match.group(1),
+                source_note=clinical_notes[note_index],
+                relevance_score=relevance_score
+            )
+    
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _extract_evidence_type(query: str) -> str | None:
         """Extract the type of evidence being searched for."""
-        query_lower = query.lower()
-        
-        # Map common MDS-related terms
-        evidence_mapping = {
-            "depression": "symptoms of depression",
-            "mood": "mood-related symptoms", 
-            "fall": "fall risk or incidents",
-            "assist": "assistance requirements",
-            "transfer": "transfer assistance needs",
-            "cognitive": "cognitive impairment",
-            "behavior": "behavioral symptoms",
-            "pain": "pain indicators",
-            "medication": "medication-related issues"
-        }
-        
-        for keyword, description in evidence_mapping.items():
-            if keyword in query_lower:
-                return description
-        
-        return None
\ No newline at end of file
+        matched = {match.group() for match in _EVIDENCE_RE.finditer(query.lower())}
+        if not matched:
+            return None
+        
+        # Earlier mapping entries win when several terms appear
+        keyword = min(matched, key=_EVIDENCE_PRIORITY.__getitem__)
+        return _EVIDENCE_MAPPING[keyword]
+
+
+class GeminiEmbedder:
+    """Gemini-powered text embeddings for similarity matching and retrieval."""
+    
+    def __init__(
+        self,
+        api_key: str,
+        model_name: str = "models/text-embedding-004",
+        query_task_type: str = "semantic_similarity",
+        cache_dir: Path | None = None
+    ) -> None:
+        """Initialize Gemini embedding service.
+        
+        Use ``query_task_type="retrieval_query"`` when query embeddings are
+        compared against ``embed_documents`` output. When ``cache_dir`` is set,
+        document embeddings are saved there and reused on later runs.
+        """
+        genai.configure(api_key=api_key)
+        self._model_name = model_name
+        self._query_task_type = query_task_type
+        self._cache_dir = cache_dir
+    
+    def embed_query(self, query: str) -> np.ndarray | None:
+        """Embed a query, or None if unavailable."""
+        try:
+            response = genai.embed_content(
+                model=self._model_name,
+                content=query,
+                task_type=self._query_task_type
+            )
+            return np.asarray(response["embedding"], dtype=np.float32)
+        except Exception as e:
+            print(f"Error embedding query with Gemini: {e}")
+            return None
+    
+    def embed_documents(self, texts: List[str]) -> np.ndarray | None:
+        """Embed documents for retrieval as one (len(texts), dim) matrix, or None if unavailable."""
+        if not texts:
+            return None
+        
+        cache_path = self._document_cache_path(texts)
+        if cache_path is not None and cache_path.exists():
+            try:
+                return np.asarray(np.load(cache_path), dtype=np.float32)
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable embedding cache {cache_path}: {e}")
+        
+        try:
+            # A list of contents is sent as batched embedding requests
+            response = genai.embed_content(
+                model=self._model_name,
+                content=texts,
+                task_type="retrieval_document"
+            )
+            embeddings = np.asarray(response["embedding"], dtype=np.float32)
+        except Exception as e:
+            print(f"Error embedding documents with Gemini: {e}")
+            return None
+        
+        if cache_path is not None:
+            self._save_embeddings(cache_path, embeddings)
+        return embeddings
+    
+    def _document_cache_path(self, texts: List[str]) -> Path | None:
+        """Path of the saved embeddings for these texts under this model, if caching."""
+        if self._cache_dir is None:
+            return None
+        
+        digest = hashlib.blake2b(self._model_name.encode(), digest_size=16)
+        for text in texts:
+            digest.update(b"\0")
+            digest.update(text.encode())
+        return self._cache_dir / f"documents-{digest.hexdigest()}.npy"
+    
+    @staticmethod
+    def _save_embeddings(cache_path: Path, embeddings: np.ndarray) -> None:
+        """Save embeddings, writing to a temporary file first so readers never see a partial one."""
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = cache_path.with_suffix(".tmp")
+            with temp_path.open("wb") as f:
+                np.save(f, embeddings)
+            temp_path.replace(cache_path)
+        except OSError as e:
+            print(f"Could not save embedding cache {cache_path}: {e}")
@@ -1,10 +1,16 @@
 from datetime import datetime, timedelta
-from typing import List
+from bisect import bisect_left
+from operator import attrgetter
+from typing import TYPE_CHECKING, Callable, List
 import json
 
 from ..domain.entities import Resident, ClinicalNote, Author, NoteType
 from ..use_cases.interfaces import ResidentRepository, ClinicalNoteRepository
 
+# numpy is only needed once notes are embedded, so listing residents never loads it
+if TYPE_CHECKING:
+    import numpy as np
+
 
 class MockResidentRepository(ResidentRepository):
     """Mock implementation of resident repository with sample data."""
@@ -61,8 +67,13 @@ class MockResidentRepository(ResidentRepository):
 class MockClinicalNoteRepository(ClinicalNoteRepository):
     """Mock implementation of clinical note repository with sample data."""
     
-    def __init__(self) -> None:
-        self._notes = self._create_mock_notes()
+    def __init__(
+        self,
+        embed_documents: Callable[[List[str]], "np.ndarray | None"] | None = None
+    ) -> None:
+        self._columns_by_resident = self._build_resident_columns(self._create_mock_notes())
+        self._embed_documents = embed_documents
+        self._embeddings_by_resident: "dict[str, np.ndarray] | None" = None
     
     def find_by_resident_id(
         self, 
@@ -70,20 +81,95 @@ class MockClinicalNoteRepository(ClinicalNoteRepository):
         since_date: datetime | None = None
     ) -> List[ClinicalNote]:
         """Find all notes for a resident, optionally filtered by date."""
-        resident_notes = [
-            note for note in self._notes 
-            if note.resident_id == resident_id
+        timestamps, notes = self._columns_by_resident.get(resident_id, ([], []))
+        
+        # Columns are oldest first, so the cutoff is a binary search
+        start = bisect_left(timestamps, since_date) if since_date else 0
+        
+        # Most recent first
+        return notes[start:][::-1]
+    
+    def find_similar(
+        self,
+        resident_id: str,
+        query_embedding: "np.ndarray",
+        k: int,
+        since_date: datetime | None = None
+    ) -> List[ClinicalNote]:
+        """Find up to k of a resident's notes most similar to a query embedding."""
+        from .scoring import top_k_similar
+        
+        embeddings = self._get_embeddings().get(resident_id)
+        if embeddings is None:
+            return self.find_by_resident_id(resident_id, since_date)
+        
+        timestamps, notes = self._columns_by_resident[resident_id]
+        start = bisect_left(timestamps, since_date) if since_date else 0
+        
+        top = top_k_similar(embeddings[start:], query_embedding, k)
+        
+        # Most recent first, matching find_by_resident_id
+        return [notes[start + i] for i in sorted(top.tolist(), reverse=True)]
+    
+    def _get_embeddings(self) -> "dict[str, np.ndarray]":
+        """Embed all notes once, on first use, as unit-length rows per resident.
+        
+        A failed embedding call is not remembered, so the next search retries it.
+        """
+        if self._embeddings_by_resident is not None:
+            return self._embeddings_by_resident
+        
+        if not self._embed_documents:
+            return {}
+        
+        # One batched call for every note, then split rows back per resident
+        resident_ids = list(self._columns_by_resident)
+        contents = [
+            note.content
+            for resident_id in resident_ids
+            for note in self._columns_by_resident[resident_id][1]
         ]
+        matrix = self._embed_documents(contents)
+        if matrix is None:
+            return {}
+        
+        import numpy as np
+        
+        # Unit rows let a dot product rank by cosine similarity; all-zero rows
+        # would divide by zero, so they are left as they are
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        matrix = matrix / norms
+        
+        embeddings_by_resident = {}
+        offset = 0
+        for resident_id in resident_ids:
+            count = len(self._columns_by_resident[resident_id][1])
+            embeddings_by_resident[resident_id] = matrix[offset:offset + count]
+            offset += count
+        
+        self._embeddings_by_resident = embeddings_by_resident
+        return embeddings_by_resident
+    
+    def _build_resident_columns(
+        self,
+        notes: List[ClinicalNote]
+    ) -> dict[str, tuple[List[datetime], List[ClinicalNote]]]:
+        """Split notes into per-resident timestamp and note columns, oldest first."""
+        notes_by_resident: dict[str, List[ClinicalNote]] = {}
+        for note in notes:
+            notes_by_resident.setdefault(note.resident_id, []).append(note)
         
-        if since_date:
-            resident_notes = [
-                note for note in resident_notes
-                if note.created_at >= since_date
-            ]
+        columns: dict[str, tuple[List[datetime], List[ClinicalNote]]] = {}
+        for resident_id, resident_notes in notes_by_resident.items():
+            # Sorting newest first and reversing keeps same-time notes in their
+            # original order once the columns are read back newest first
+            resident_notes.sort(key=attrgetter("created_at"), reverse=True)
+            resident_notes.reverse()
+            timestamps = [note.created_at for note in resident_notes]
+            columns[resident_id] = (timestamps, resident_notes)
         
-        # Sort by date (most recent first)
-        resident_notes.sort(key=lambda x: x.created_at, reverse=True)
-        return resident_notes
+        return columns
     
     def _create_mock_notes(self) -> List[ClinicalNote]:
         """Create comprehensive mock clinical notes for demo scenarios."""
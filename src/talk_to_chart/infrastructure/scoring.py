@@ -0,0 +1,24 @@
+import numpy as np
+
+
+def top_k_similar(embeddings: np.ndarray, query_vector: np.ndarray, k: int) -> np.ndarray:
+    """Return row indices of the k embeddings most similar to the query, best first.
+    
+    Rows of ``embeddings`` are expected to be unit length so the dot product
+    ranks by cosine similarity.
+    """
+    if k <= 0 or len(embeddings) == 0:
+        return np.empty(0, dtype=np.intp)
+    
+    query = np.asarray(query_vector, dtype=embeddings.dtype)
+    return _top_k(embeddings @ query, k)
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Return the indices of the k highest scores, highest first."""
+    # Partial selection is O(n); only the k survivors are fully sorted
+    if k < len(scores):
+        candidates = np.argpartition(scores, -k)[-k:]
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
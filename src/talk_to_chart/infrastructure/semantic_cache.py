@@ -0,0 +1,160 @@
+import hashlib
+from collections import OrderedDict
+from typing import Callable, Generic, List, Tuple, TypeVar
+
+import numpy as np
+
+from ..domain.entities import ClinicalNote, SearchResults
+from ..use_cases.interfaces import SearchResultsCache
+
+
+T = TypeVar("T")
+
+
+def fingerprint_notes(clinical_notes: List[ClinicalNote]) -> str:
+    """Hash note identities so cached results are invalidated when the chart changes."""
+    digest = hashlib.blake2b(digest_size=16)
+    for note in clinical_notes:
+        digest.update(note.id.encode())
+        digest.update(note.created_at.isoformat().encode())
+    return digest.hexdigest()
+
+
+class SemanticQueryCache(Generic[T]):
+    """Fixed-capacity cache that matches queries by embedding similarity.
+
+    Entries are scoped by namespace so a hit can only return a value that was
+    stored for the same namespace (e.g. the same set of clinical notes).
+    """
+
+    def __init__(self, threshold: float = 0.92, capacity: int = 1024) -> None:
+        self._threshold = threshold
+        self._capacity = capacity
+        self._vectors: np.ndarray | None = None
+        self._namespaces = np.empty(capacity, dtype=object)
+        self._values: List[T | None] = [None] * capacity
+        self._last_used = np.zeros(capacity, dtype=np.int64)
+        self._size = 0
+        self._clock = 0
+
+    def lookup(self, namespace: str, embedding: np.ndarray) -> T | None:
+        """Return the cached value for the most similar query, if close enough."""
+        if self._vectors is None or self._size == 0:
+            return None
+
+        query_vector = self._normalize(embedding)
+        scores = self._vectors[:self._size] @ query_vector
+        scores[self._namespaces[:self._size] != namespace] = -1.0
+
+        best = int(np.argmax(scores))
+        if scores[best] < self._threshold:
+            return None
+
+        self._touch(best)
+        return self._values[best]
+
+    def store(self, namespace: str, embedding: np.ndarray, value: T) -> None:
+        """Cache a value, replacing the least recently used entry when full."""
+        query_vector = self._normalize(embedding)
+        if self._vectors is None:
+            self._vectors = np.zeros((self._capacity, query_vector.shape[0]), dtype=np.float32)
+
+        if self._size < self._capacity:
+            slot = self._size
+            self._size += 1
+        else:
+            slot = int(np.argmin(self._last_used))
+
+        self._vectors[slot] = query_vector
+        self._namespaces[slot] = namespace
+        self._values[slot] = value
+        self._touch(slot)
+
+    def _touch(self, slot: int) -> None:
+        """Mark an entry as most recently used."""
+        self._clock += 1
+        self._last_used[slot] = self._clock
+
+    @staticmethod
+    def _normalize(embedding: np.ndarray) -> np.ndarray:
+        """Scale a vector to unit length so dot products are cosine similarities."""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+class SemanticSearchCache(SearchResultsCache):
+    """Search results cache matching identical and paraphrased queries.
+
+    Entries are namespaced by resident and by the notes the search ran over,
+    so a result expires once notes enter or leave the lookback window.
+    """
+
+    def __init__(
+        self,
+        embed_query: Callable[[str], np.ndarray | None],
+        threshold: float = 0.9,
+        capacity: int = 1024
+    ) -> None:
+        self._embed_query = embed_query
+        self._capacity = capacity
+        self._last_embedding: Tuple[str, np.ndarray | None] | None = None
+        self._exact: "OrderedDict[Tuple[str, str], SearchResults]" = OrderedDict()
+        self._similar: SemanticQueryCache[SearchResults] = SemanticQueryCache(
+            threshold=threshold,
+            capacity=capacity
+        )
+
+    def get(
+        self,
+        resident_id: str,
+        query: str,
+        clinical_notes: List[ClinicalNote]
+    ) -> SearchResults | None:
+        """Return cached results for the same or a similar query, if any."""
+        exact_key = self._exact_key(resident_id, query, clinical_notes)
+        cached = self._exact.get(exact_key)
+        if cached is not None:
+            self._exact.move_to_end(exact_key)
+            return cached
+
+        embedding = self._embedding_for(query)
+        if embedding is None:
+            return None
+        return self._similar.lookup(exact_key[0], embedding)
+
+    def put(
+        self,
+        resident_id: str,
+        query: str,
+        clinical_notes: List[ClinicalNote],
+        results: SearchResults
+    ) -> None:
+        """Cache results for a query against the given notes."""
+        exact_key = self._exact_key(resident_id, query, clinical_notes)
+        self._exact[exact_key] = results
+        self._exact.move_to_end(exact_key)
+        if len(self._exact) > self._capacity:
+            self._exact.popitem(last=False)
+
+        embedding = self._embedding_for(query)
+        if embedding is not None:
+            self._similar.store(exact_key[0], embedding, results)
+
+    def _embedding_for(self, query: str) -> np.ndarray | None:
+        """Embed a query, reusing the embedding from a lookup that just missed."""
+        if self._last_embedding is not None and self._last_embedding[0] == query:
+            return self._last_embedding[1]
+        embedding = self._embed_query(query)
+        self._last_embedding = (query, embedding)
+        return embedding
+
+    @staticmethod
+    def _exact_key(
+        resident_id: str,
+        query: str,
+        clinical_notes: List[ClinicalNote]
+    ) -> Tuple[str, str]:
+        """Build the (namespace, normalized query) key for a search."""
+        namespace = f"{resident_id}:{fingerprint_notes(clinical_notes)}"
+        return namespace, query.strip().lower()
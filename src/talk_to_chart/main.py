@@ -1,16 +1,19 @@
+import itertools
 import os
-from typing import Optional
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional, Tuple
 import typer
 from dotenv import load_dotenv
 
 from .use_cases.interfaces import (
+    ResidentRepository,
     SearchClinicalNotesUseCase,
     GetResidentsUseCase, 
     GetResidentUseCase
 )
-from .infrastructure.gemini_service import GeminiQueryProcessor
-from .infrastructure.repositories import MockResidentRepository, MockClinicalNoteRepository
 from .adapters.controllers import TalkToChartController, TalkToChartPresenter
+from .domain.entities import SearchResults
 
 
 # Load environment variables
@@ -19,8 +22,28 @@ load_dotenv()
 app = typer.Typer(help="Talk to the Chart - AI-powered clinical documentation search")
 
 
-def create_app() -> TalkToChartController:
-    """Create and configure the application with dependency injection."""
+@lru_cache(maxsize=1)
+def create_resident_repository() -> ResidentRepository:
+    """Create the resident repository shared by every command in the process."""
+    from .infrastructure.repositories import MockResidentRepository
+    
+    return MockResidentRepository()
+
+
+@lru_cache(maxsize=1)
+def create_presenter() -> TalkToChartPresenter:
+    """Create the presenter shared by every command in the process."""
+    return TalkToChartPresenter()
+
+
+@lru_cache(maxsize=1)
+def create_app() -> Tuple[TalkToChartController, TalkToChartPresenter]:
+    """Create and configure the application with dependency injection.
+    
+    The wiring is built once per process so repositories, caches, the Gemini
+    clients and the presenter's console are shared by every command that runs
+    in it.
+    """
     
     # Get Gemini API key
     api_key = os.getenv("GEMINI_API_KEY")
@@ -30,18 +53,36 @@ def create_app() -> TalkToChartController:
         typer.echo("GEMINI_API_KEY=your_api_key_here")
         raise typer.Exit(1)
     
-    # Infrastructure layer
-    resident_repository = MockResidentRepository()
-    note_repository = MockClinicalNoteRepository()
+    # Infrastructure layer, imported here so the Gemini SDK only loads when needed
+    from .infrastructure.gemini_service import GeminiQueryProcessor, GeminiEmbedder
+    from .infrastructure.semantic_cache import SemanticSearchCache
+    from .infrastructure.repositories import MockClinicalNoteRepository
+    
+    # Note embeddings are derived from PHI, so they only touch disk on request
+    cache_dir_setting = os.getenv("EMBEDDING_CACHE_DIR")
+    embedding_cache_dir = Path(cache_dir_setting) if cache_dir_setting else None
+    retrieval_embedder = GeminiEmbedder(
+        api_key,
+        query_task_type="retrieval_query",
+        cache_dir=embedding_cache_dir
+    )
+    resident_repository = create_resident_repository()
+    note_repository = MockClinicalNoteRepository(retrieval_embedder.embed_documents)
     ai_processor = GeminiQueryProcessor(api_key)
+    results_cache = SemanticSearchCache(GeminiEmbedder(api_key).embed_query)
     
     # Use cases layer  
-    search_use_case = SearchClinicalNotesUseCase(note_repository, ai_processor)
+    search_use_case = SearchClinicalNotesUseCase(
+        note_repository,
+        ai_processor,
+        results_cache=results_cache,
+        query_embedder=retrieval_embedder
+    )
     get_residents_use_case = GetResidentsUseCase(resident_repository)
     get_resident_use_case = GetResidentUseCase(resident_repository)
     
     # Interface adapters layer
-    presenter = TalkToChartPresenter()
+    presenter = create_presenter()
     controller = TalkToChartController(
         search_use_case, 
         get_residents_use_case,
@@ -49,31 +90,35 @@ def create_app() -> TalkToChartController:
         presenter
     )
     
-    return controller
+    return controller, presenter
 
 
 @app.command()
 def start() -> None:
     """Start the interactive Talk to Chart session."""
     try:
-        controller = create_app()
-        run_interactive_session(controller)
+        controller, presenter = create_app()
+        run_interactive_session(controller, presenter)
     except Exception as e:
         typer.echo(f"Application error: {e}")
         raise typer.Exit(1)
 
 
-def run_interactive_session(controller: TalkToChartController) -> None:
+def run_interactive_session(
+    controller: TalkToChartController,
+    presenter: TalkToChartPresenter
+) -> None:
     """Run the main interactive session."""
-    presenter = controller._presenter
-    
     # Welcome message
     presenter.display_welcome()
     
+    refresh_residents = False
+    
     while True:
         try:
-            # Step 1: Show available residents
-            residents = controller.get_residents()
+            # Step 1: Show available residents (cached for the session)
+            residents = controller.get_residents(refresh=refresh_residents)
+            refresh_residents = False
             controller.display_residents(residents)
             
             # Step 2: Get resident selection
@@ -83,8 +128,13 @@ def run_interactive_session(controller: TalkToChartController) -> None:
                 presenter.display_info("Session ended.")
                 break
             
+            if resident_id.lower() == "r":
+                refresh_residents = True
+                presenter.display_info("Refreshing resident list.")
+                continue
+            
             # Validate resident exists
-            resident = next((r for r in residents if r.id == resident_id), None)
+            resident = controller.find_resident(resident_id)
             if not resident:
                 presenter.display_error(f"Resident ID '{resident_id}' not found.")
                 continue
@@ -99,12 +149,18 @@ def run_interactive_session(controller: TalkToChartController) -> None:
                 if not query:
                     break
                 
-                # Process query
+                # Process query, showing each result as soon as it arrives
+                presenter.display_search_header(query, resident)
                 presenter.display_info("Searching clinical notes...")
-                results = controller.search_clinical_notes(resident_id, query)
-                
-                # Display results
-                controller.display_search_results(results)
+                result_numbers = itertools.count(1)
+                results = controller.stream_clinical_notes(
+                    resident_id,
+                    query,
+                    lambda result: presenter.display_partial_result(
+                        next(result_numbers), result
+                    )
+                )
+                presenter.display_stream_summary(results)
                 
                 # Ask if user wants to continue with this resident
                 if not presenter.confirm_continue():
@@ -122,20 +178,28 @@ def run_interactive_session(controller: TalkToChartController) -> None:
 
 
 @app.command()
-def demo() -> None:
+def demo(
+    batch: bool = typer.Option(
+        False,
+        "--batch",
+        help="Send each resident's demo queries to Gemini in a single request."
+    )
+) -> None:
     """Run a quick demo with predefined queries."""
     try:
-        controller = create_app()
-        run_demo(controller)
+        controller, presenter = create_app()
+        run_demo(controller, presenter, batch=batch)
     except Exception as e:
         typer.echo(f"Demo error: {e}")
         raise typer.Exit(1)
 
 
-def run_demo(controller: TalkToChartController) -> None:
+def run_demo(
+    controller: TalkToChartController,
+    presenter: TalkToChartPresenter,
+    batch: bool = False
+) -> None:
     """Run predefined demo scenarios."""
-    presenter = controller._presenter
-    
     presenter.display_welcome()
     presenter.display_info("Running demo with predefined queries...\n")
     
@@ -158,15 +222,21 @@ def run_demo(controller: TalkToChartController) -> None:
         }
     ]
     
+    # In batch mode, answer every scenario up front with one call per resident
+    batched_results = _search_demo_batch(controller, demo_scenarios) if batch else None
+    
     for i, scenario in enumerate(demo_scenarios, 1):
         presenter.display_info(f"Demo {i}: {scenario['resident_name']}")
         presenter.console.print(f"[bold]Query:[/bold] {scenario['query']}")
         
         # Execute search
-        results = controller.search_clinical_notes(
-            scenario["resident_id"], 
-            scenario["query"]
-        )
+        if batched_results is not None:
+            results = batched_results[i - 1]
+        else:
+            results = controller.search_clinical_notes(
+                scenario["resident_id"], 
+                scenario["query"]
+            )
         
         # Display results
         controller.display_search_results(results)
@@ -176,13 +246,36 @@ def run_demo(controller: TalkToChartController) -> None:
             presenter.console.print("\n" + "="*60 + "\n")
 
 
+def _search_demo_batch(
+    controller: TalkToChartController,
+    demo_scenarios: List[dict[str, str]]
+) -> List[SearchResults]:
+    """Search all demo scenarios, batching queries that share a resident."""
+    queries_by_resident: dict[str, List[int]] = {}
+    for i, scenario in enumerate(demo_scenarios):
+        queries_by_resident.setdefault(scenario["resident_id"], []).append(i)
+    
+    results_by_index: dict[int, SearchResults] = {}
+    for resident_id, indexes in queries_by_resident.items():
+        batch_results = controller.search_clinical_notes_batch(
+            resident_id,
+            [demo_scenarios[i]["query"] for i in indexes]
+        )
+        results_by_index.update(zip(indexes, batch_results))
+    
+    return [results_by_index[i] for i in range(len(demo_scenarios))]
+
+
 @app.command()
 def list_residents() -> None:
-    """List all available residents."""
+    """List all available residents.
+    
+    Listing never queries Gemini, so it skips create_app and neither loads the
+    SDK nor needs an API key.
+    """
     try:
-        controller = create_app()
-        residents = controller.get_residents()
-        controller.display_residents(residents)
+        residents = GetResidentsUseCase(create_resident_repository()).execute()
+        create_presenter().display_residents(residents)
     except Exception as e:
         typer.echo(f"Error: {e}")
         raise typer.Exit(1)
@@ -1,9 +1,20 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from abc import ABC, abstractmethod
-from typing import List, Protocol
+from typing import TYPE_CHECKING, Callable, Iterator, List, Protocol
 from datetime import datetime, timedelta
+from operator import attrgetter
 
 from ..domain.entities import Resident, ClinicalNote, SearchResults, QueryResult
 
+# Vectors are only annotated here, so numpy is not imported at runtime
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class AIQueryError(Exception):
+    """Raised when the AI service fails to answer a query."""
+
 
 class ResidentRepository(Protocol):
     """Repository interface for resident data access."""
@@ -25,12 +36,41 @@ class ClinicalNoteRepository(Protocol):
         resident_id: str, 
         since_date: datetime | None = None
     ) -> List[ClinicalNote]:
-        """Find all notes for a resident, optionally filtered by date."""
+        """Find all notes for a resident, optionally filtered by date.
+        
+        Implementations must apply ``since_date`` in the underlying query
+        (e.g. ``WHERE resident_id = ? AND created_at >= ?`` backed by an index
+        on ``(resident_id, created_at DESC)``) rather than loading every note
+        and filtering afterwards. Use cases pass ``since_date`` bucketed to
+        midnight, so repeated calls on the same day use identical arguments.
+        """
+        pass
+    
+    def find_similar(
+        self,
+        resident_id: str,
+        query_embedding: "np.ndarray",
+        k: int,
+        since_date: datetime | None = None
+    ) -> List[ClinicalNote]:
+        """Find up to k of a resident's notes most similar to a query embedding."""
+        pass
+
+
+class QueryEmbedder(Protocol):
+    """Interface for embedding queries to retrieve relevant notes."""
+    
+    def embed_query(self, query: str) -> "np.ndarray | None":
+        """Embed a query, or return None if embeddings are unavailable."""
         pass
 
 
 class AIQueryProcessor(Protocol):
-    """Interface for AI-powered query processing."""
+    """Interface for AI-powered query processing.
+    
+    Query methods raise ``AIQueryError`` when the AI service fails, so a
+    failure is never mistaken for a query that matched nothing.
+    """
     
     def process_query(
         self, 
@@ -40,11 +80,63 @@ class AIQueryProcessor(Protocol):
         """Process natural language query against clinical notes."""
         pass
     
+    async def process_query_async(
+        self,
+        query: str,
+        clinical_notes: List[ClinicalNote]
+    ) -> List[QueryResult]:
+        """Process a query without blocking the event loop."""
+        pass
+    
+    def process_query_stream(
+        self,
+        query: str,
+        clinical_notes: List[ClinicalNote]
+    ) -> Iterator[QueryResult]:
+        """Process a query, yielding each result as soon as it is available."""
+        pass
+    
+    def process_queries(
+        self,
+        queries: List[str],
+        clinical_notes: List[ClinicalNote]
+    ) -> List[List[QueryResult]]:
+        """Process several queries against the same notes, one result list per query."""
+        pass
+    
     def generate_summary(self, query: str, results: List[QueryResult]) -> str:
         """Generate a summary of the search results."""
         pass
 
 
+class SearchResultsCache(Protocol):
+    """Interface for caching search results across repeated queries.
+    
+    ``clinical_notes`` is every note in the resident's lookback window, not
+    just the notes a query was narrowed to, so that paraphrases of a query
+    share cached results.
+    """
+    
+    def get(
+        self,
+        resident_id: str,
+        query: str,
+        clinical_notes: List[ClinicalNote]
+    ) -> SearchResults | None:
+        """Get cached results for a query against the given notes, if any."""
+        pass
+    
+    def put(
+        self,
+        resident_id: str,
+        query: str,
+        clinical_notes: List[ClinicalNote],
+        results: SearchResults
+    ) -> None:
+        """Cache results for a query against the given notes."""
+        pass
+
+
 class SearchClinicalNotesUseCase:
     """Use case for searching clinical notes using natural language."""
     
@@ -52,21 +144,33 @@ class SearchClinicalNotesUseCase:
         self,
         note_repository: ClinicalNoteRepository,
         ai_processor: AIQueryProcessor,
-        lookback_days: int = 14
+        lookback_days: int = 14,
+        results_cache: SearchResultsCache | None = None,
+        query_embedder: QueryEmbedder | None = None,
+        top_k: int = 20,
+        chunk_size: int = 10,
+        max_concurrent_requests: int = 4
     ) -> None:
         self._note_repository = note_repository
         self._ai_processor = ai_processor
         self._lookback_days = lookback_days
+        self._results_cache = results_cache
+        self._query_embedder = query_embedder
+        self._top_k = top_k
+        self._chunk_size = chunk_size
+        self._max_concurrent_requests = max_concurrent_requests
+        # Bounded to stay within the AI service's rate limits
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent_requests)
     
     def execute(self, resident_id: str, query: str) -> SearchResults:
         """Execute the search use case."""
         # Calculate lookback date
-        since_date = datetime.now() - timedelta(days=self._lookback_days)
+        since_date = self._since_date()
         
         # Get clinical notes for the resident
-        notes = self._note_repository.find_by_resident_id(resident_id, since_date)
+        window_notes = self._note_repository.find_by_resident_id(resident_id, since_date)
         
-        if not notes:
+        if not window_notes:
             return SearchResults(
                 query=query,
                 resident=None,  # Will need to fetch this separately
@@ -74,18 +178,286 @@ class SearchClinicalNotesUseCase:
                 summary="No clinical notes found for the specified time period."
             )
         
-        # Process query with AI
-        results = self._ai_processor.process_query(query, notes)
+        # Reuse results for the same or a similar query on these notes
+        if self._results_cache:
+            cached = self._results_cache.get(resident_id, query, window_notes)
+            if cached is not None:
+                return self._reuse_cached(query, cached)
+        
+        notes = self._select_notes(resident_id, query, since_date, window_notes)
+        
+        # Process query with AI; failures are reported but never cached
+        try:
+            results = self._process_in_chunks(query, notes)
+        except AIQueryError as e:
+            return self._failed_search(query, e)
         
         # Generate summary
-        summary = self._ai_processor.generate_summary(query, results)
+        summary = self._summarize(query, results)
         
-        return SearchResults(
+        search_results = SearchResults(
             query=query,
             resident=None,  # Will be populated by the controller
             results=results,
             summary=summary
         )
+        
+        if self._results_cache:
+            self._results_cache.put(resident_id, query, window_notes, search_results)
+        
+        return search_results
+    
+    async def execute_async(self, resident_id: str, query: str) -> SearchResults:
+        """Execute the search use case without blocking the event loop.
+        
+        This is the entry point for asyncio callers embedding the library; the
+        CLI commands use ``execute``, ``execute_stream`` and ``execute_batch``.
+        Notes are chunked as in ``execute``, with asyncio tasks in place of threads.
+        """
+        since_date = self._since_date()
+        
+        window_notes = await asyncio.to_thread(
+            self._note_repository.find_by_resident_id, resident_id, since_date
+        )
+        
+        if not window_notes:
+            return SearchResults(
+                query=query,
+                resident=None,
+                results=[],
+                summary="No clinical notes found for the specified time period."
+            )
+        
+        # Cache lookups may call an embedding service, so keep them off the loop
+        if self._results_cache:
+            cached = await asyncio.to_thread(
+                self._results_cache.get, resident_id, query, window_notes
+            )
+            if cached is not None:
+                return self._reuse_cached(query, cached)
+        
+        notes = await asyncio.to_thread(
+            self._select_notes, resident_id, query, since_date, window_notes
+        )
+        
+        try:
+            results = await self._process_in_chunks_async(query, notes)
+        except AIQueryError as e:
+            return self._failed_search(query, e)
+        summary = self._summarize(query, results)
+        
+        search_results = SearchResults(
+            query=query,
+            resident=None,  # Will be populated by the controller
+            results=results,
+            summary=summary
+        )
+        
+        if self._results_cache:
+            await asyncio.to_thread(
+                self._results_cache.put, resident_id, query, window_notes, search_results
+            )
+        
+        return search_results
+    
+    def execute_stream(
+        self,
+        resident_id: str,
+        query: str,
+        on_result: Callable[[QueryResult], None]
+    ) -> SearchResults:
+        """Execute the search, passing each result to ``on_result`` as it arrives.
+        
+        Results arrive in the order the AI returns them rather than by relevance;
+        the returned search results hold them sorted, with the summary.
+        """
+        since_date = self._since_date()
+        
+        window_notes = self._note_repository.find_by_resident_id(resident_id, since_date)
+        
+        if not window_notes:
+            return SearchResults(
+                query=query,
+                resident=None,
+                results=[],
+                summary="No clinical notes found for the specified time period."
+            )
+        
+        if self._results_cache:
+            cached = self._results_cache.get(resident_id, query, window_notes)
+            if cached is not None:
+                for result in cached.results:
+                    on_result(result)
+                return self._reuse_cached(query, cached)
+        
+        notes = self._select_notes(resident_id, query, since_date, window_notes)
+        
+        results: List[QueryResult] = []
+        try:
+            for result in self._ai_processor.process_query_stream(query, notes):
+                results.append(result)
+                on_result(result)
+        except AIQueryError as e:
+            # Results from an interrupted stream are incomplete, so don't cache them
+            return self._failed_search(query, e)
+        
+        results.sort(key=attrgetter("relevance_score"), reverse=True)
+        search_results = SearchResults(
+            query=query,
+            resident=None,  # Will be populated by the controller
+            results=results,
+            summary=self._summarize(query, results)
+        )
+        
+        # Only a stream that finished cleanly is cached for later searches
+        if self._results_cache:
+            self._results_cache.put(resident_id, query, window_notes, search_results)
+        
+        return search_results
+    
+    def execute_batch(self, resident_id: str, queries: List[str]) -> List[SearchResults]:
+        """Execute several searches against one resident's notes together."""
+        since_date = self._since_date()
+        
+        # Notes are fetched once and shared across all queries
+        notes = self._note_repository.find_by_resident_id(resident_id, since_date)
+        
+        if not notes:
+            return [
+                SearchResults(
+                    query=query,
+                    resident=None,
+                    results=[],
+                    summary="No clinical notes found for the specified time period."
+                )
+                for query in queries
+            ]
+        
+        try:
+            batch_results = self._ai_processor.process_queries(queries, notes)
+        except AIQueryError as e:
+            return [self._failed_search(query, e) for query in queries]
+        
+        return [
+            SearchResults(
+                query=query,
+                resident=None,  # Will be populated by the controller
+                results=results,
+                summary=self._summarize(query, results)
+            )
+            for query, results in zip(queries, batch_results)
+        ]
+    
+    def _reuse_cached(self, query: str, cached: SearchResults) -> SearchResults:
+        """Answer a query with cached results, which may have been stored for a paraphrase."""
+        if cached.query == query:
+            return cached
+        return SearchResults(
+            query=query,
+            resident=None,  # Will be populated by the controller
+            results=cached.results,
+            summary=self._summarize(query, cached.results)
+        )
+    
+    def _failed_search(self, query: str, error: AIQueryError) -> SearchResults:
+        """Build the results reported when the AI service could not answer."""
+        return SearchResults(
+            query=query,
+            resident=None,  # Will be populated by the controller
+            results=[],
+            summary=f"The search could not be completed ({error}). Please try again."
+        )
+    
+    def _since_date(self) -> datetime:
+        """Start of the lookback window, snapped to midnight.
+        
+        Snapping keeps the window identical for every search made on the same
+        day, so results keyed on the notes searched stay cacheable.
+        """
+        lookback_start = datetime.now() - timedelta(days=self._lookback_days)
+        return lookback_start.replace(hour=0, minute=0, second=0, microsecond=0)
+    
+    def _summarize(self, query: str, results: List[QueryResult]) -> str:
+        """Generate a summary of the results."""
+        # Nothing to summarize, so don't spend an AI call on it
+        if not results:
+            return f"No matches found for '{query}'."
+        
+        return self._ai_processor.generate_summary(query, results)
+    
+    def _process_in_chunks(
+        self,
+        query: str,
+        notes: List[ClinicalNote]
+    ) -> List[QueryResult]:
+        """Query large note sets as concurrent chunks and merge the results.
+        
+        With the default ``top_k`` of 20 and ``chunk_size`` of 10, a search
+        sends two requests at once, so its latency is that of the slower one
+        rather than of one request over every note.
+        """
+        if len(notes) <= self._chunk_size:
+            return self._ai_processor.process_query(query, notes)
+        
+        chunk_results = self._executor.map(
+            lambda chunk: self._ai_processor.process_query(query, chunk),
+            [
+                notes[start:start + self._chunk_size]
+                for start in range(0, len(notes), self._chunk_size)
+            ]
+        )
+        
+        results = [result for chunk in chunk_results for result in chunk]
+        results.sort(key=attrgetter("relevance_score"), reverse=True)
+        return results
+    
+    async def _process_in_chunks_async(
+        self,
+        query: str,
+        notes: List[ClinicalNote]
+    ) -> List[QueryResult]:
+        """Query large note sets as concurrent chunks without blocking the event loop."""
+        if len(notes) <= self._chunk_size:
+            return await self._ai_processor.process_query_async(query, notes)
+        
+        # Bound in-flight requests to stay within the AI service's rate limits
+        semaphore = asyncio.Semaphore(self._max_concurrent_requests)
+        
+        async def process_chunk(chunk: List[ClinicalNote]) -> List[QueryResult]:
+            async with semaphore:
+                return await self._ai_processor.process_query_async(query, chunk)
+        
+        chunk_results = await asyncio.gather(*(
+            process_chunk(notes[start:start + self._chunk_size])
+            for start in range(0, len(notes), self._chunk_size)
+        ))
+        
+        results = [result for chunk in chunk_results for result in chunk]
+        results.sort(key=attrgetter("relevance_score"), reverse=True)
+        return results
+    
+    def _select_notes(
+        self,
+        resident_id: str,
+        query: str,
+        since_date: datetime,
+        window_notes: List[ClinicalNote]
+    ) -> List[ClinicalNote]:
+        """Narrow the lookback window to the notes most relevant to the query.
+        
+        Embedding the query is skipped when the whole window already fits
+        within ``top_k`` notes.
+        """
+        if self._query_embedder is None or len(window_notes) <= self._top_k:
+            return window_notes
+        
+        query_embedding = self._query_embedder.embed_query(query)
+        if query_embedding is None:
+            return window_notes
+        
+        return self._note_repository.find_similar(
+            resident_id, query_embedding, self._top_k, since_date
+        )
 
 
 class GetResidentsUseCase:
@@ -107,4 +479,8 @@ class GetResidentUseCase:
     
     def execute(self, resident_id: str) -> Resident | None:
         """Get a specific resident by ID."""
-        return self._resident_repository.find_by_id(resident_id)
\ No newline at end of file
+        return self._resident_repository.find_by_id(resident_id)
+    
+    async def execute_async(self, resident_id: str) -> Resident | None:
+        """Get a specific resident by ID without blocking the event loop."""
+        return await asyncio.to_thread(self.execute, resident_id)
\ No newline at end of file
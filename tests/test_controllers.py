@@ -0,0 +1,87 @@
+"""
+Tests for the controller's session-level resident caching.
+"""
+import io
+import pytest
+from datetime import datetime
+from typing import List
+
+from rich.console import Console
+
+from talk_to_chart.adapters.controllers import TalkToChartController, TalkToChartPresenter
+from talk_to_chart.domain.entities import Resident
+from talk_to_chart.use_cases.interfaces import GetResidentsUseCase, GetResidentUseCase
+
+
+class CountingResidentRepository:
+    """In-memory resident repository that counts full fetches."""
+    
+    def __init__(self, residents: List[Resident]) -> None:
+        self.residents = residents
+        self.find_all_calls = 0
+    
+    def find_all(self) -> List[Resident]:
+        self.find_all_calls += 1
+        return list(self.residents)
+    
+    def find_by_id(self, resident_id: str) -> Resident | None:
+        return next((r for r in self.residents if r.id == resident_id), None)
+
+
+def make_resident(resident_id: str, name: str) -> Resident:
+    """Create a resident."""
+    return Resident(resident_id, name, "101A", datetime(2024, 1, 15))
+
+
+def make_controller(
+    repository: CountingResidentRepository,
+    presenter: TalkToChartPresenter | None = None
+) -> TalkToChartController:
+    """Create a controller over the given resident repository."""
+    return TalkToChartController(
+        None,  # Searching is not exercised by these tests
+        GetResidentsUseCase(repository),
+        GetResidentUseCase(repository),
+        presenter or TalkToChartPresenter(Console(file=io.StringIO()))
+    )
+
+
+@pytest.fixture
+def repository() -> CountingResidentRepository:
+    """Create a resident repository with two residents."""
+    return CountingResidentRepository([
+        make_resident("RES001", "Mary Johnson"),
+        make_resident("RES002", "Robert Williams")
+    ])
+
+
+def test_residents_are_fetched_once_per_session(
+    repository: CountingResidentRepository
+) -> None:
+    """Test that listing and finding residents reuse the first fetch."""
+    controller = make_controller(repository)
+    
+    controller.get_residents()
+    controller.get_residents()
+    resident = controller.find_resident("RES002")
+    
+    assert resident is not None and resident.name == "Robert Williams"
+    assert controller.find_resident("NONEXISTENT") is None
+    assert repository.find_all_calls == 1
+
+
+def test_refresh_fetches_residents_again(
+    repository: CountingResidentRepository
+) -> None:
+    """Test that a refresh picks up residents added since the last fetch."""
+    controller = make_controller(repository)
+    controller.get_residents()
+    repository.residents.append(make_resident("RES003", "Dorothy Davis"))
+    
+    assert controller.find_resident("RES003") is None
+    
+    residents = controller.get_residents(refresh=True)
+    
+    assert [r.id for r in residents] == ["RES001", "RES002", "RES003"]
+    assert controller.find_resident("RES003") is not None
+    assert repository.find_all_calls == 2
@@ -0,0 +1,325 @@
+"""
+Tests for the Gemini query processor's prompt handling and response parsing.
+A fake model stands in for the Gemini API, so no network calls are made.
+"""
+import numpy as np
+import pytest
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Iterator, List
+
+from talk_to_chart.domain.entities import Author, ClinicalNote, NoteType
+from talk_to_chart.infrastructure import gemini_service
+from talk_to_chart.infrastructure.gemini_service import GeminiEmbedder, GeminiQueryProcessor
+from talk_to_chart.use_cases.interfaces import AIQueryError
+
+
+class FakeModel:
+    """Stand-in for a Gemini model that returns canned responses in order.
+    
+    Streamed calls send the response split into the given chunks.
+    """
+    
+    def __init__(
+        self,
+        responses: List[str],
+        error: Exception | None = None,
+        chunks: List[str] | None = None
+    ) -> None:
+        self._responses = list(responses)
+        self._error = error
+        self._chunks = list(chunks or [])
+        self.prompts: List[str] = []
+        self.chunks_sent = 0
+    
+    def generate_content(
+        self,
+        prompt: str,
+        stream: bool = False
+    ) -> SimpleNamespace | Iterator[SimpleNamespace]:
+        self.prompts.append(prompt)
+        if self._error:
+            raise self._error
+        if stream:
+            return self._stream()
+        return SimpleNamespace(text=self._responses.pop(0))
+    
+    def _stream(self) -> Iterator[SimpleNamespace]:
+        for chunk in self._chunks:
+            self.chunks_sent += 1
+            yield SimpleNamespace(text=chunk)
+
+
+class FakeEmbedContent:
+    """Stand-in for genai.embed_content that embeds each text by its length."""
+    
+    def __init__(self) -> None:
+        self.calls = 0
+    
+    def __call__(self, model: str, content: List[str], task_type: str) -> dict[str, Any]:
+        self.calls += 1
+        return {"embedding": [[float(len(text)), 1.0] for text in content]}
+
+
+@pytest.fixture
+def embed_content(monkeypatch: pytest.MonkeyPatch) -> FakeEmbedContent:
+    """Replace the Gemini embedding call with a fake that counts requests."""
+    fake = FakeEmbedContent()
+    monkeypatch.setattr(gemini_service.genai, "embed_content", fake)
+    return fake
+
+
+@pytest.fixture
+def clinical_notes() -> List[ClinicalNote]:
+    """Create clinical notes for one resident."""
+    base_date = datetime(2024, 3, 1, 9, 30)
+    author = Author("Test Nurse", "RN")
+    
+    return [
+        ClinicalNote(
+            id=f"NOTE_00{i}",
+            resident_id="RES001",
+            content=content,
+            note_type=NoteType.NURSING,
+            author=author,
+            created_at=base_date + timedelta(days=i)
+        )
+        for i, content in enumerate([
+            "Resident appears sad and withdrawn",
+            "Required two-person assist for transfer",
+            "Found on floor beside bed, no injury"
+        ])
+    ]
+
+
+def make_processor(model: FakeModel) -> GeminiQueryProcessor:
+    """Create a processor that talks to a fake model."""
+    processor = GeminiQueryProcessor("test-key")
+    processor.model = model
+    return processor
+
+
+def test_parse_search_response_reads_fields_in_any_order(
+    clinical_notes: List[ClinicalNote]
+) -> None:
+    """Test that quote, note ID and relevance are found wherever they sit in an entry."""
+    processor = make_processor(FakeModel([]))
+    response_text = (
+        'SNIPPET: "sad and withdrawn"\nNOTE_ID: NOTE_0\nRELEVANCE: 6\n\n'
+        'SNIPPET:\nRELEVANCE: 8\nNOTE_ID: NOTE_1\n"two-person assist"\n\n'
+        'SNIPPET: "on floor"\nNOTE_ID: NOTE_2\n'
+    )
+    
+    results = processor._parse_search_response(response_text, clinical_notes)
+    
+    assert [(r.snippet, r.relevance_score) for r in results] == [
+        ("two-person assist", 0.8),
+        ("sad and withdrawn", 0.6),
+        ("on floor", 0.5)
+    ]
+    assert [r.source_note for r in results] == [
+        clinical_notes[1], clinical_notes[0], clinical_notes[2]
+    ]
+
+
+def test_parse_search_response_skips_incomplete_entries(
+    clinical_notes: List[ClinicalNote]
+) -> None:
+    """Test that entries without a quote, a note ID or a valid index are dropped."""
+    processor = make_processor(FakeModel([]))
+    response_text = (
+        'SNIPPET: no quote here\nNOTE_ID: NOTE_0\nRELEVANCE: 9\n'
+        'SNIPPET: "no note id"\nRELEVANCE: 9\n'
+        'SNIPPET: "unknown note"\nNOTE_ID: NOTE_7\nRELEVANCE: 9\n'
+        'SNIPPET: "kept"\nNOTE_ID: NOTE_2\nRELEVANCE: 4\n'
+    )
+    
+    results = processor._parse_search_response(response_text, clinical_notes)
+    
+    assert [r.snippet for r in results] == ["kept"]
+
+
+def test_split_batch_response_assigns_blocks_by_marker() -> None:
+    """Test that each marker's text goes to its query, whatever the order."""
+    processor = make_processor(FakeModel([]))
+    response_text = (
+        "=== QUERY_1 ===\nSNIPPET: \"b\"\n"
+        "=== QUERY_5 ===\nSNIPPET: \"out of range\"\n"
+        "=== QUERY_0 ===\nSNIPPET: \"a\"\n"
+    )
+    
+    blocks = processor._split_batch_response(response_text, 3)
+    
+    assert blocks[0] == "\nSNIPPET: \"a\"\n"
+    assert blocks[1] == "\nSNIPPET: \"b\"\n"
+    assert blocks[2] is None
+
+
+def test_process_queries_parses_each_block(clinical_notes: List[ClinicalNote]) -> None:
+    """Test that a batched response is parsed into one result list per query."""
+    model = FakeModel([
+        "=== QUERY_0 ===\n"
+        "SNIPPET: \"sad and withdrawn\"\nNOTE_ID: NOTE_0\nRELEVANCE: 9\n\n"
+        "=== QUERY_1 ===\n"
+        "SNIPPET: \"two-person assist\"\nNOTE_ID: NOTE_1\nRELEVANCE: 8\n"
+        "SNIPPET: \"bad index\"\nNOTE_ID: NOTE_7\nRELEVANCE: 8\n"
+    ])
+    processor = make_processor(model)
+    
+    batch_results = processor.process_queries(["depression", "transfers"], clinical_notes)
+    
+    assert [[r.snippet for r in results] for results in batch_results] == [
+        ["sad and withdrawn"],
+        ["two-person assist"]
+    ]
+    assert batch_results[1][0].source_note is clinical_notes[1]
+    assert len(model.prompts) == 1
+
+
+def test_process_queries_only_sends_uncached_queries(
+    clinical_notes: List[ClinicalNote]
+) -> None:
+    """Test that queries answered before are not sent to Gemini again."""
+    model = FakeModel([
+        "=== QUERY_0 ===\nSNIPPET: \"sad and withdrawn\"\nNOTE_ID: NOTE_0\n",
+        "=== QUERY_0 ===\nSNIPPET: \"on floor\"\nNOTE_ID: NOTE_2\n"
+    ])
+    processor = make_processor(model)
+    processor.process_queries(["depression"], clinical_notes)
+    
+    batch_results = processor.process_queries(["Depression ", "falls"], clinical_notes)
+    
+    assert [[r.snippet for r in results] for results in batch_results] == [
+        ["sad and withdrawn"],
+        ["on floor"]
+    ]
+    assert model.prompts[1].endswith("QUERIES:\nQUERY_0: falls")
+
+
+def test_process_queries_does_not_cache_missing_blocks(
+    clinical_notes: List[ClinicalNote]
+) -> None:
+    """Test that a query left out of the response is retried next time."""
+    model = FakeModel([
+        "=== QUERY_1 ===\nSNIPPET: \"on floor\"\nNOTE_ID: NOTE_2\n",
+        "=== QUERY_0 ===\nSNIPPET: \"sad and withdrawn\"\nNOTE_ID: NOTE_0\n"
+    ])
+    processor = make_processor(model)
+    
+    first = processor.process_queries(["depression", "falls"], clinical_notes)
+    second = processor.process_queries(["depression", "falls"], clinical_notes)
+    
+    assert first[0] == []
+    assert [r.snippet for r in second[0]] == ["sad and withdrawn"]
+    assert [r.snippet for r in second[1]] == ["on floor"]
+    assert len(model.prompts) == 2
+
+
+def test_process_queries_does_not_cache_failures(
+    clinical_notes: List[ClinicalNote]
+) -> None:
+    """Test that a failed Gemini call raises and caches nothing."""
+    processor = make_processor(FakeModel([], error=RuntimeError("quota exceeded")))
+    
+    with pytest.raises(AIQueryError, match="quota exceeded"):
+        processor.process_queries(["depression", "falls"], clinical_notes)
+    
+    assert len(processor._result_cache) == 0
+
+
+def test_process_query_failure_is_raised_and_retried(
+    clinical_notes: List[ClinicalNote]
+) -> None:
+    """Test that a failed query is reported rather than answered with no results."""
+    model = FakeModel([], error=RuntimeError("service unavailable"))
+    processor = make_processor(model)
+    
+    with pytest.raises(AIQueryError):
+        processor.process_query("depression", clinical_notes)
+    
+    model._error = None
+    model._responses.append('SNIPPET: "sad and withdrawn"\nNOTE_ID: NOTE_0\n')
+    results = processor.process_query("depression", clinical_notes)
+    
+    assert [r.snippet for r in results] == ["sad and withdrawn"]
+    assert len(model.prompts) == 2
+
+
+def test_process_query_stream_yields_each_entry_once_complete(
+    clinical_notes: List[ClinicalNote]
+) -> None:
+    """Test that streamed entries are parsed once the next marker arrives, even when split."""
+    model = FakeModel([], chunks=[
+        'SNIPPET: "sad and with',
+        'drawn"\nNOTE_ID: NOTE_0\nRELEVANCE: 6\nSNIP',
+        'PET: "two-person assist"\nNOTE_ID: NOTE_1\n',
+        'RELEVANCE: 8\nSNIPPET: "on floor"\nNOTE_ID: NOTE_2\n'
+    ])
+    processor = make_processor(model)
+    
+    arrivals = [
+        (result.snippet, model.chunks_sent)
+        for result in processor.process_query_stream("depression", clinical_notes)
+    ]
+    
+    assert arrivals == [
+        ("sad and withdrawn", 3),
+        ("two-person assist", 4),
+        ("on floor", 4)
+    ]
+    cached = processor.process_query("depression", clinical_notes)
+    assert [r.snippet for r in cached] == ["two-person assist", "sad and withdrawn", "on floor"]
+    assert len(model.prompts) == 1
+
+
+def test_embed_documents_reuses_saved_embeddings(
+    embed_content: FakeEmbedContent,
+    tmp_path: Path
+) -> None:
+    """Test that a second run loads saved embeddings instead of calling Gemini."""
+    texts = ["sad and withdrawn", "on floor"]
+    
+    first = GeminiEmbedder("test-key", cache_dir=tmp_path).embed_documents(texts)
+    second = GeminiEmbedder("test-key", cache_dir=tmp_path).embed_documents(texts)
+    
+    assert first is not None and second is not None
+    np.testing.assert_array_equal(second, first)
+    assert second.dtype == np.float32
+    assert embed_content.calls == 1
+    assert len(list(tmp_path.glob("documents-*.npy"))) == 1
+
+
+def test_embed_documents_replaces_unreadable_cache_file(
+    embed_content: FakeEmbedContent,
+    tmp_path: Path
+) -> None:
+    """Test that a corrupt cache file is re-embedded and overwritten."""
+    texts = ["sad and withdrawn"]
+    embedder = GeminiEmbedder("test-key", cache_dir=tmp_path)
+    embedder.embed_documents(texts)
+    cache_file = next(tmp_path.glob("documents-*.npy"))
+    cache_file.write_bytes(b"not an array")
+    
+    embeddings = embedder.embed_documents(texts)
+    
+    assert embeddings is not None
+    np.testing.assert_array_equal(embeddings, [[17.0, 1.0]])
+    assert embed_content.calls == 2
+    np.testing.assert_array_equal(np.load(cache_file), embeddings)
+
+
+def test_embed_documents_writes_nothing_without_cache_dir(
+    embed_content: FakeEmbedContent,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that embeddings stay in memory unless a cache directory is given."""
+    monkeypatch.chdir(tmp_path)
+    embedder = GeminiEmbedder("test-key")
+    
+    embedder.embed_documents(["sad and withdrawn"])
+    embedder.embed_documents(["sad and withdrawn"])
+    
+    assert embed_content.calls == 2
+    assert list(tmp_path.iterdir()) == []
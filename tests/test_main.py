@@ -0,0 +1,150 @@
+"""
+Tests for the interactive session loop, driven by scripted prompts.
+"""
+import io
+import os
+import subprocess
+import sys
+from datetime import datetime, timedelta
+from typing import List
+
+from rich.console import Console
+
+from talk_to_chart.adapters.controllers import TalkToChartController, TalkToChartPresenter
+from talk_to_chart.domain.entities import Author, ClinicalNote, NoteType, QueryResult
+from talk_to_chart.main import run_interactive_session
+from talk_to_chart.use_cases.interfaces import (
+    GetResidentsUseCase, GetResidentUseCase, SearchClinicalNotesUseCase
+)
+
+from tests.test_controllers import CountingResidentRepository, make_controller, make_resident
+from tests.test_search_use_case import MockAIProcessor, MockNoteRepository
+
+
+class ScriptedPresenter(TalkToChartPresenter):
+    """Presenter that answers prompts from a script and records output."""
+    
+    def __init__(self, resident_ids: List[str], queries: List[str] | None = None) -> None:
+        super().__init__(Console(file=io.StringIO(), width=120))
+        self._resident_ids = list(resident_ids)
+        self._queries = list(queries or [])
+    
+    def prompt_resident_selection(self) -> str:
+        return self._resident_ids.pop(0)
+    
+    def prompt_query(self, resident_name: str) -> str:
+        return self._queries.pop(0) if self._queries else ""
+    
+    def confirm_continue(self) -> bool:
+        return True
+    
+    @property
+    def output(self) -> str:
+        return self.console.file.getvalue()
+
+
+def test_r_at_resident_prompt_refreshes_residents() -> None:
+    """Test that entering r refetches the resident list before prompting again."""
+    repository = CountingResidentRepository([make_resident("RES001", "Mary Johnson")])
+    presenter = ScriptedPresenter(["r", ""])
+    controller = make_controller(repository, presenter)
+    
+    run_interactive_session(controller, presenter)
+    
+    assert repository.find_all_calls == 2
+    assert "Refreshing resident list." in presenter.output
+
+
+def test_resident_list_is_reused_between_prompts() -> None:
+    """Test that returning to the resident prompt does not refetch residents."""
+    repository = CountingResidentRepository([make_resident("RES001", "Mary Johnson")])
+    presenter = ScriptedPresenter(["NONEXISTENT", ""])
+    controller = make_controller(repository, presenter)
+    
+    run_interactive_session(controller, presenter)
+    
+    assert repository.find_all_calls == 1
+    assert "Resident ID 'NONEXISTENT' not found." in presenter.output
+
+
+def make_search_controller(
+    presenter: TalkToChartPresenter,
+    notes: List[ClinicalNote],
+    results: List[QueryResult]
+) -> TalkToChartController:
+    """Create a controller that searches the given notes with canned AI results."""
+    repository = CountingResidentRepository([make_resident("RES001", "Mary Johnson")])
+    return TalkToChartController(
+        SearchClinicalNotesUseCase(MockNoteRepository(notes), MockAIProcessor(results)),
+        GetResidentsUseCase(repository),
+        GetResidentUseCase(repository),
+        presenter
+    )
+
+
+def test_streamed_search_shows_header_summary_and_filters() -> None:
+    """Test that a streamed search frames its results like a regular search."""
+    author = Author("Test Nurse", "RN")
+    notes = [
+        ClinicalNote(
+            id="NOTE_001",
+            resident_id="RES001",
+            content="Resident appears sad and withdrawn",
+            note_type=NoteType.NURSING,
+            author=author,
+            created_at=datetime.now() - timedelta(days=2)
+        ),
+        ClinicalNote(
+            id="NOTE_002",
+            resident_id="RES001",
+            content="Tearful during group activity",
+            note_type=NoteType.THERAPY,
+            author=author,
+            created_at=datetime.now() - timedelta(days=1)
+        )
+    ]
+    presenter = ScriptedPresenter(["RES001", ""], ["test query"])
+    controller = make_search_controller(presenter, notes, [
+        QueryResult("sad and withdrawn", notes[0], 0.9),
+        QueryResult("Tearful", notes[1], 0.7)
+    ])
+    
+    run_interactive_session(controller, presenter)
+    
+    output = presenter.output
+    assert "Query: test query" in output
+    assert "Resident: Mary Johnson" in output
+    assert output.index("Result 2") < output.index("Found 2 results for test query")
+    assert "Filter by: [All] [Nursing] [Therapy]" in output
+
+
+def test_streamed_search_reports_missing_notes() -> None:
+    """Test that a resident without recent notes gets the no-notes message."""
+    presenter = ScriptedPresenter(["RES001", ""], ["test query"])
+    controller = make_search_controller(presenter, [], [])
+    
+    run_interactive_session(controller, presenter)
+    
+    assert "No clinical notes found for the specified time period." in presenter.output
+
+
+def test_list_residents_does_not_load_gemini() -> None:
+    """Test that listing residents works without an API key, the Gemini SDK or numpy."""
+    env = {k: v for k, v in os.environ.items() if k != "GEMINI_API_KEY"}
+    script = (
+        "import sys\n"
+        "from talk_to_chart.main import list_residents\n"
+        "list_residents()\n"
+        "assert 'google.generativeai' not in sys.modules\n"
+        "assert 'numpy' not in sys.modules\n"
+    )
+    
+    completed = subprocess.run(
+        [sys.executable, "-c", script],
+        env=env,
+        capture_output=True,
+        text=True
+    )
+    
+    assert completed.returncode == 0, completed.stderr
+    assert "GEMINI_API_KEY" not in completed.stdout
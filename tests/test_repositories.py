@@ -0,0 +1,147 @@
+"""
+Tests for the in-memory repositories' indexed lookups.
+"""
+import warnings
+import zlib
+import numpy as np
+import pytest
+from datetime import datetime, timedelta
+from typing import List
+
+from talk_to_chart.infrastructure.repositories import MockClinicalNoteRepository
+
+
+def text_vector(text: str) -> np.ndarray:
+    """Deterministic pseudo-embedding for a piece of text."""
+    rng = np.random.default_rng(zlib.crc32(text.encode()))
+    return rng.standard_normal(32).astype(np.float32)
+
+
+def fake_embed_documents(texts: List[str]) -> np.ndarray:
+    """Embed documents without calling an embedding service."""
+    return np.stack([text_vector(text) for text in texts])
+
+
+@pytest.fixture
+def note_repository() -> MockClinicalNoteRepository:
+    """Create the mock clinical note repository."""
+    return MockClinicalNoteRepository()
+
+
+@pytest.fixture
+def embedded_repository() -> MockClinicalNoteRepository:
+    """Create the mock clinical note repository with fake note embeddings."""
+    return MockClinicalNoteRepository(fake_embed_documents)
+
+
+@pytest.mark.parametrize("days_back", [1, 3, 14])
+def test_since_date_lookup_matches_full_scan(
+    note_repository: MockClinicalNoteRepository,
+    days_back: int
+) -> None:
+    """Test that the bisected date cutoff returns the same notes as a scan."""
+    all_notes = note_repository.find_by_resident_id("RES001")
+    cutoff_date = datetime.now() - timedelta(days=days_back, hours=1)
+    
+    recent_notes = note_repository.find_by_resident_id("RES001", cutoff_date)
+    
+    assert recent_notes == [n for n in all_notes if n.created_at >= cutoff_date]
+
+
+def test_notes_are_returned_most_recent_first(
+    note_repository: MockClinicalNoteRepository
+) -> None:
+    """Test that resident notes come back newest first."""
+    notes = note_repository.find_by_resident_id("RES002")
+    
+    timestamps = [note.created_at for note in notes]
+    assert timestamps == sorted(timestamps, reverse=True)
+    assert all(note.resident_id == "RES002" for note in notes)
+
+
+def test_unknown_resident_has_no_notes(
+    note_repository: MockClinicalNoteRepository
+) -> None:
+    """Test lookups for a resident without notes."""
+    assert note_repository.find_by_resident_id("NONEXISTENT") == []
+    assert note_repository.find_by_resident_id("NONEXISTENT", datetime.now()) == []
+
+
+def test_find_similar_returns_top_k_newest_first(
+    embedded_repository: MockClinicalNoteRepository
+) -> None:
+    """Test that similarity search keeps the k best notes, newest first."""
+    all_notes = embedded_repository.find_by_resident_id("RES001")
+    target = all_notes[2]
+    
+    notes = embedded_repository.find_similar("RES001", text_vector(target.content), 3)
+    
+    timestamps = [note.created_at for note in notes]
+    assert len(notes) == 3
+    assert target in notes
+    assert timestamps == sorted(timestamps, reverse=True)
+    assert all(note.resident_id == "RES001" for note in notes)
+
+
+def test_find_similar_only_searches_the_lookback_window(
+    embedded_repository: MockClinicalNoteRepository
+) -> None:
+    """Test that notes older than since_date are never returned."""
+    all_notes = embedded_repository.find_by_resident_id("RES001")
+    oldest = all_notes[-1]
+    cutoff_date = oldest.created_at + timedelta(hours=1)
+    
+    notes = embedded_repository.find_similar(
+        "RES001", text_vector(oldest.content), len(all_notes), cutoff_date
+    )
+    
+    assert notes == embedded_repository.find_by_resident_id("RES001", cutoff_date)
+    assert oldest not in notes
+
+
+def test_find_similar_falls_back_when_embedding_fails() -> None:
+    """Test that notes are returned unranked when documents cannot be embedded."""
+    repository = MockClinicalNoteRepository(lambda texts: None)
+    
+    notes = repository.find_similar("RES001", np.ones(32, dtype=np.float32), 2)
+    
+    assert notes == repository.find_by_resident_id("RES001")
+
+
+def test_find_similar_retries_failed_embedding() -> None:
+    """Test that a failed embedding call is retried by the next search."""
+    responses: List[np.ndarray | None] = [None]
+    
+    def flaky_embed_documents(texts: List[str]) -> np.ndarray | None:
+        return responses.pop(0) if responses else fake_embed_documents(texts)
+    
+    repository = MockClinicalNoteRepository(flaky_embed_documents)
+    all_notes = repository.find_by_resident_id("RES001")
+    query = text_vector(all_notes[2].content)
+    
+    assert repository.find_similar("RES001", query, 2) == all_notes
+    retried = repository.find_similar("RES001", query, 2)
+    assert len(retried) == 2
+    assert all_notes[2] in retried
+
+
+def test_find_similar_tolerates_zero_embeddings() -> None:
+    """Test that all-zero note embeddings are ranked without a divide warning."""
+    repository = MockClinicalNoteRepository(
+        lambda texts: np.zeros((len(texts), 32), dtype=np.float32)
+    )
+    
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        notes = repository.find_similar("RES001", np.ones(32, dtype=np.float32), 2)
+    
+    assert len(notes) == 2
+
+
+def test_find_similar_for_unknown_resident(
+    embedded_repository: MockClinicalNoteRepository
+) -> None:
+    """Test similarity search for a resident without notes."""
+    assert embedded_repository.find_similar(
+        "NONEXISTENT", np.ones(32, dtype=np.float32), 3
+    ) == []
@@ -0,0 +1,30 @@
+"""
+Tests for embedding similarity ranking.
+"""
+import numpy as np
+
+from talk_to_chart.infrastructure.scoring import top_k_similar
+
+
+def test_top_k_similar_ranks_best_first() -> None:
+    """Test that the most similar rows come back in descending score order."""
+    embeddings = np.array([
+        [1.0, 0.0],
+        [0.0, 1.0],
+        [0.8, 0.6],
+        [0.6, 0.8]
+    ], dtype=np.float32)
+    
+    top = top_k_similar(embeddings, np.array([1.0, 0.0]), 3)
+    
+    assert top.tolist() == [0, 2, 3]
+
+
+def test_top_k_similar_handles_small_inputs() -> None:
+    """Test that k beyond the row count returns every row and k of zero returns none."""
+    embeddings = np.array([[0.0, 1.0], [1.0, 0.0]], dtype=np.float32)
+    query = np.array([1.0, 0.0])
+    
+    assert top_k_similar(embeddings, query, 5).tolist() == [1, 0]
+    assert top_k_similar(embeddings, query, 0).tolist() == []
+    assert top_k_similar(embeddings[:0], query, 3).tolist() == []
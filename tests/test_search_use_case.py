@@ -2,15 +2,20 @@
 Example tests demonstrating how Clean Architecture enables easy testing.
 Business logic can be tested without external dependencies.
 """
+import asyncio
+import threading
+import numpy as np
 import pytest
 from datetime import datetime, timedelta
-from typing import List
+from operator import attrgetter
+from typing import Iterator, List
 
 from talk_to_chart.domain.entities import (
-    ClinicalNote, Author, NoteType, QueryResult, Resident
+    ClinicalNote, Author, NoteType, QueryResult, Resident, SearchResults
 )
 from talk_to_chart.use_cases.interfaces import (
-    ClinicalNoteRepository, AIQueryProcessor, SearchClinicalNotesUseCase
+    ClinicalNoteRepository, AIQueryError, AIQueryProcessor,
+    SearchClinicalNotesUseCase, SearchResultsCache
 )
 
 
@@ -25,10 +30,38 @@ class MockNoteRepository(ClinicalNoteRepository):
         resident_id: str, 
         since_date: datetime | None = None
     ) -> List[ClinicalNote]:
-        filtered_notes = [n for n in self._notes if n.resident_id == resident_id]
-        if since_date:
-            filtered_notes = [n for n in filtered_notes if n.created_at >= since_date]
-        return filtered_notes
+        # Reference behaviour: both filters applied in a single pass
+        return [
+            n for n in self._notes
+            if n.resident_id == resident_id
+            and (since_date is None or n.created_at >= since_date)
+        ]
+
+
+class MockSimilarityRepository(MockNoteRepository):
+    """Mock repository that records similarity searches and returns the newest k notes."""
+    
+    def __init__(self, notes: List[ClinicalNote]) -> None:
+        super().__init__(notes)
+        self.similar_calls: List[int] = []
+    
+    def find_similar(
+        self,
+        resident_id: str,
+        query_embedding: np.ndarray,
+        k: int,
+        since_date: datetime | None = None
+    ) -> List[ClinicalNote]:
+        self.similar_calls.append(k)
+        notes = self.find_by_resident_id(resident_id, since_date)
+        return sorted(notes, key=attrgetter("created_at"), reverse=True)[:k]
+
+
+class MockQueryEmbedder:
+    """Mock query embedder for testing."""
+    
+    def embed_query(self, query: str) -> np.ndarray | None:
+        return np.ones(4, dtype=np.float32)
 
 
 class MockAIProcessor(AIQueryProcessor):
@@ -36,18 +69,102 @@ class MockAIProcessor(AIQueryProcessor):
     
     def __init__(self, mock_results: List[QueryResult]) -> None:
         self._mock_results = mock_results
+        self.error: AIQueryError | None = None
+        self.queried_notes: List[List[ClinicalNote]] = []
+        self.query_calls = 0
+        self.summary_calls = 0
     
     def process_query(
         self, 
         query: str, 
         clinical_notes: List[ClinicalNote]
     ) -> List[QueryResult]:
+        self.query_calls += 1
+        self.queried_notes.append(clinical_notes)
+        if self.error:
+            raise self.error
         return self._mock_results
     
+    async def process_query_async(
+        self,
+        query: str,
+        clinical_notes: List[ClinicalNote]
+    ) -> List[QueryResult]:
+        return self.process_query(query, clinical_notes)
+    
+    def process_query_stream(
+        self,
+        query: str,
+        clinical_notes: List[ClinicalNote]
+    ) -> Iterator[QueryResult]:
+        self.query_calls += 1
+        for result in self._mock_results:
+            yield result
+            # Fail after the first result, like a dropped connection
+            if self.error:
+                raise self.error
+    
+    def process_queries(
+        self,
+        queries: List[str],
+        clinical_notes: List[ClinicalNote]
+    ) -> List[List[QueryResult]]:
+        self.query_calls += 1
+        if self.error:
+            raise self.error
+        return [self._mock_results for _ in queries]
+    
     def generate_summary(self, query: str, results: List[QueryResult]) -> str:
+        self.summary_calls += 1
         return f"Found {len(results)} results for test query"
 
 
+class BarrierAIProcessor(MockAIProcessor):
+    """Mock AI processor that answers only once two queries are in flight at once."""
+    
+    def __init__(self) -> None:
+        super().__init__([])
+        self._barrier = threading.Barrier(2, timeout=5)
+    
+    def process_query(
+        self,
+        query: str,
+        clinical_notes: List[ClinicalNote]
+    ) -> List[QueryResult]:
+        # A serial caller never releases the barrier and fails with a timeout
+        self._barrier.wait()
+        note = clinical_notes[0]
+        relevance_score = 0.8 if note.id == "NOTE_002" else 0.5
+        return [QueryResult(note.content, note, relevance_score)]
+
+
+class MockResultsCache(SearchResultsCache):
+    """In-memory results cache for testing, with optional query aliases."""
+    
+    def __init__(self, aliases: dict[str, str] | None = None) -> None:
+        self._entries: dict[tuple[str, str], SearchResults] = {}
+        self._aliases = aliases or {}
+        self.looked_up_notes: List[List[ClinicalNote]] = []
+    
+    def get(
+        self,
+        resident_id: str,
+        query: str,
+        clinical_notes: List[ClinicalNote]
+    ) -> SearchResults | None:
+        self.looked_up_notes.append(clinical_notes)
+        return self._entries.get((resident_id, self._aliases.get(query, query)))
+    
+    def put(
+        self,
+        resident_id: str,
+        query: str,
+        clinical_notes: List[ClinicalNote],
+        results: SearchResults
+    ) -> None:
+        self._entries[(resident_id, query)] = results
+
+
 @pytest.fixture
 def sample_notes() -> List[ClinicalNote]:
     """Create sample clinical notes for testing."""
@@ -128,6 +245,89 @@ def test_search_filters_by_date_range(
     assert recent_notes[0].id == "NOTE_002"
 
 
+def test_lookback_window_starts_at_midnight(
+    sample_notes: List[ClinicalNote]
+) -> None:
+    """Test that the lookback window covers the whole of its first day."""
+    start_of_yesterday = (datetime.now() - timedelta(days=1)).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    early_note = ClinicalNote(
+        id="NOTE_004",
+        resident_id="RES001",
+        content="Resident slept through the night",
+        note_type=NoteType.NURSING,
+        author=sample_notes[0].author,
+        created_at=start_of_yesterday
+    )
+    note_repository = MockNoteRepository(sample_notes + [early_note])
+    use_case = SearchClinicalNotesUseCase(
+        note_repository,
+        MockAIProcessor([]),
+        lookback_days=1
+    )
+    
+    results = use_case.execute("RES001", "test query")
+    
+    assert "No clinical notes found" not in results.summary
+
+
+def test_search_narrows_notes_with_query_embedding(
+    sample_notes: List[ClinicalNote]
+) -> None:
+    """Test that an embedder narrows large note sets to the top k before querying."""
+    note_repository = MockSimilarityRepository(sample_notes)
+    ai_processor = MockAIProcessor([])
+    use_case = SearchClinicalNotesUseCase(
+        note_repository,
+        ai_processor,
+        query_embedder=MockQueryEmbedder(),
+        top_k=1
+    )
+    
+    use_case.execute("RES001", "test query")
+    
+    assert note_repository.similar_calls == [1]
+    assert [n.id for n in ai_processor.queried_notes[0]] == ["NOTE_002"]
+
+
+def test_search_skips_embedding_when_notes_fit_top_k(
+    sample_notes: List[ClinicalNote]
+) -> None:
+    """Test that a lookback window within top k is searched whole."""
+    note_repository = MockSimilarityRepository(sample_notes)
+    ai_processor = MockAIProcessor([])
+    use_case = SearchClinicalNotesUseCase(
+        note_repository,
+        ai_processor,
+        query_embedder=MockQueryEmbedder(),
+        top_k=5
+    )
+    
+    use_case.execute("RES001", "test query")
+    
+    assert note_repository.similar_calls == []
+    assert len(ai_processor.queried_notes[0]) == 2
+
+
+def test_cached_results_are_keyed_on_the_whole_window(
+    sample_notes: List[ClinicalNote]
+) -> None:
+    """Test that the results cache sees every note in the window, not just the top k."""
+    results_cache = MockResultsCache()
+    use_case = SearchClinicalNotesUseCase(
+        MockSimilarityRepository(sample_notes),
+        MockAIProcessor([]),
+        results_cache=results_cache,
+        query_embedder=MockQueryEmbedder(),
+        top_k=1
+    )
+    
+    use_case.execute("RES001", "test query")
+    
+    assert {n.id for n in results_cache.looked_up_notes[0]} == {"NOTE_001", "NOTE_002"}
+
+
 def test_search_handles_no_results(
     sample_notes: List[ClinicalNote]
 ) -> None:
@@ -142,6 +342,234 @@ def test_search_handles_no_results(
     assert "No clinical notes found" in results.summary
 
 
+def test_search_reuses_cached_results(
+    sample_notes: List[ClinicalNote]
+) -> None:
+    """Test that a repeated query is answered from the results cache."""
+    ai_processor = MockAIProcessor([
+        QueryResult(
+            snippet="Resident appears sad and withdrawn",
+            source_note=sample_notes[0],
+            relevance_score=0.9
+        )
+    ])
+    use_case = SearchClinicalNotesUseCase(
+        MockNoteRepository(sample_notes),
+        ai_processor,
+        results_cache=MockResultsCache()
+    )
+    
+    first = use_case.execute("RES001", "test query")
+    ai_processor._mock_results = []  # A fresh AI call would now find nothing
+    second = use_case.execute("RES001", "test query")
+    
+    assert second is first
+    assert second.count == 1
+
+
+def test_failed_search_is_reported_and_not_cached(
+    sample_notes: List[ClinicalNote]
+) -> None:
+    """Test that an AI failure is reported and the next attempt retries it."""
+    ai_processor = MockAIProcessor([
+        QueryResult(
+            snippet="Resident appears sad and withdrawn",
+            source_note=sample_notes[0],
+            relevance_score=0.9
+        )
+    ])
+    ai_processor.error = AIQueryError("service unavailable")
+    use_case = SearchClinicalNotesUseCase(
+        MockNoteRepository(sample_notes),
+        ai_processor,
+        results_cache=MockResultsCache()
+    )
+    
+    failed = use_case.execute("RES001", "test query")
+    ai_processor.error = None
+    retried = use_case.execute("RES001", "test query")
+    
+    assert failed.count == 0
+    assert "service unavailable" in failed.summary
+    assert retried.count == 1
+    assert ai_processor.query_calls == 2
+
+
+def test_interrupted_stream_is_not_cached(
+    sample_notes: List[ClinicalNote]
+) -> None:
+    """Test that results from a stream that failed partway are not cached."""
+    ai_processor = MockAIProcessor([
+        QueryResult(
+            snippet="Resident appears sad and withdrawn",
+            source_note=sample_notes[0],
+            relevance_score=0.9
+        ),
+        QueryResult(
+            snippet="Required two-person assist for transfer",
+            source_note=sample_notes[1],
+            relevance_score=0.8
+        )
+    ])
+    ai_processor.error = AIQueryError("connection reset")
+    results_cache = MockResultsCache()
+    use_case = SearchClinicalNotesUseCase(
+        MockNoteRepository(sample_notes),
+        ai_processor,
+        results_cache=results_cache
+    )
+    
+    streamed: List[QueryResult] = []
+    results = use_case.execute_stream("RES001", "test query", streamed.append)
+    
+    assert len(streamed) == 1
+    assert "connection reset" in results.summary
+    assert results_cache.get("RES001", "test query", sample_notes) is None
+
+
+def test_paraphrase_cache_hit_reports_callers_query(
+    sample_notes: List[ClinicalNote]
+) -> None:
+    """Test that results cached for a paraphrase are labelled with the new query."""
+    ai_processor = MockAIProcessor([
+        QueryResult(
+            snippet="Resident appears sad and withdrawn",
+            source_note=sample_notes[0],
+            relevance_score=0.9
+        )
+    ])
+    use_case = SearchClinicalNotesUseCase(
+        MockNoteRepository(sample_notes),
+        ai_processor,
+        results_cache=MockResultsCache({"depression symptoms": "signs of depression"})
+    )
+    
+    first = use_case.execute("RES001", "signs of depression")
+    second = use_case.execute("RES001", "depression symptoms")
+    
+    assert second.query == "depression symptoms"
+    assert second.results == first.results
+    assert ai_processor.query_calls == 1
+
+
+def test_empty_results_skip_summary_generation(
+    sample_notes: List[ClinicalNote]
+) -> None:
+    """Test that a query with no matches does not ask the AI for a summary."""
+    ai_processor = MockAIProcessor([])
+    use_case = SearchClinicalNotesUseCase(MockNoteRepository(sample_notes), ai_processor)
+    
+    results = use_case.execute("RES001", "test query")
+    
+    assert results.count == 0
+    assert results.summary == "No matches found for 'test query'."
+    assert ai_processor.summary_calls == 0
+
+
+def test_streamed_search_reports_and_caches_results(
+    sample_notes: List[ClinicalNote]
+) -> None:
+    """Test that a streamed search reports each result and returns and caches the full set."""
+    mock_results = [
+        QueryResult(
+            snippet="Resident appears sad and withdrawn",
+            source_note=sample_notes[0],
+            relevance_score=0.6
+        ),
+        QueryResult(
+            snippet="Required two-person assist for transfer",
+            source_note=sample_notes[1],
+            relevance_score=0.9
+        )
+    ]
+    results_cache = MockResultsCache()
+    use_case = SearchClinicalNotesUseCase(
+        MockNoteRepository(sample_notes),
+        MockAIProcessor(mock_results),
+        results_cache=results_cache
+    )
+    
+    streamed: List[QueryResult] = []
+    results = use_case.execute_stream("RES001", "test query", streamed.append)
+    cached = results_cache.get("RES001", "test query", sample_notes)
+    
+    assert streamed == mock_results
+    assert [r.relevance_score for r in results.results] == [0.9, 0.6]
+    assert results.summary == "Found 2 results for test query"
+    assert cached is results
+
+
+def test_streamed_search_reports_missing_notes(
+    search_use_case: SearchClinicalNotesUseCase
+) -> None:
+    """Test that a streamed search for a resident without notes says so."""
+    streamed: List[QueryResult] = []
+    
+    results = search_use_case.execute_stream("NONEXISTENT", "test query", streamed.append)
+    
+    assert streamed == []
+    assert results.summary == "No clinical notes found for the specified time period."
+
+
+def test_async_search_matches_sync_search(
+    search_use_case: SearchClinicalNotesUseCase
+) -> None:
+    """Test that the async entry point produces the same results as execute."""
+    results = asyncio.run(search_use_case.execute_async("RES001", "test query"))
+    
+    assert results == search_use_case.execute("RES001", "test query")
+
+
+def test_async_search_merges_note_chunks(
+    sample_notes: List[ClinicalNote]
+) -> None:
+    """Test that large note sets are queried in chunks and the results merged."""
+    ai_processor = MockAIProcessor([
+        QueryResult(
+            snippet="Resident appears sad and withdrawn",
+            source_note=sample_notes[0],
+            relevance_score=0.9
+        )
+    ])
+    use_case = SearchClinicalNotesUseCase(
+        MockNoteRepository(sample_notes),
+        ai_processor,
+        chunk_size=1
+    )
+    
+    results = asyncio.run(use_case.execute_async("RES001", "test query"))
+    
+    # RES001 has two notes, so one result per single-note chunk
+    assert results.count == 2
+
+
+def test_search_queries_note_chunks_concurrently(
+    sample_notes: List[ClinicalNote]
+) -> None:
+    """Test that execute sends note chunks at the same time and merges the results."""
+    use_case = SearchClinicalNotesUseCase(
+        MockNoteRepository(sample_notes),
+        BarrierAIProcessor(),
+        chunk_size=1
+    )
+    
+    results = use_case.execute("RES001", "test query")
+    
+    assert [r.source_note for r in results.results] == [sample_notes[1], sample_notes[0]]
+
+
+def test_batch_search_returns_results_per_query(
+    search_use_case: SearchClinicalNotesUseCase
+) -> None:
+    """Test that a batch search yields one result set per query, in order."""
+    queries = ["first query", "second query"]
+    
+    batch_results = search_use_case.execute_batch("RES001", queries)
+    
+    assert [results.query for results in batch_results] == queries
+    assert all(results.count == 1 for results in batch_results)
+
+
 def test_query_result_formatting() -> None:
     """Test QueryResult value object formatting."""
     author = Author("Test Author", "RN")
@@ -0,0 +1,156 @@
+"""
+Tests for the embedding-similarity caches.
+A stub embedder maps queries to fixed vectors, so no network calls are made.
+"""
+import numpy as np
+import pytest
+from datetime import datetime
+from typing import List
+
+from talk_to_chart.domain.entities import (
+    Author, ClinicalNote, NoteType, QueryResult, SearchResults
+)
+from talk_to_chart.infrastructure.semantic_cache import (
+    SemanticQueryCache, SemanticSearchCache
+)
+
+
+class StubEmbedder:
+    """Embeds queries from a fixed table and counts the calls."""
+    
+    def __init__(self, vectors: dict[str, List[float]]) -> None:
+        self._vectors = vectors
+        self.calls: List[str] = []
+    
+    def embed_query(self, query: str) -> np.ndarray | None:
+        self.calls.append(query)
+        vector = self._vectors.get(query)
+        return None if vector is None else np.asarray(vector, dtype=np.float32)
+
+
+@pytest.fixture
+def clinical_notes() -> List[ClinicalNote]:
+    """Create clinical notes for one resident."""
+    return [
+        ClinicalNote(
+            id="NOTE_001",
+            resident_id="RES001",
+            content="Resident appears sad and withdrawn",
+            note_type=NoteType.NURSING,
+            author=Author("Test Nurse", "RN"),
+            created_at=datetime(2024, 3, 1, 9, 30)
+        )
+    ]
+
+
+def make_results(query: str, clinical_notes: List[ClinicalNote]) -> SearchResults:
+    """Create search results for a query."""
+    return SearchResults(
+        query=query,
+        resident=None,
+        results=[QueryResult("sad and withdrawn", clinical_notes[0], 0.9)],
+        summary="I found 1 relevant notes for your query:"
+    )
+
+
+def test_query_cache_matches_only_above_threshold() -> None:
+    """Test that lookups return a value only for sufficiently similar vectors."""
+    cache: SemanticQueryCache[str] = SemanticQueryCache(threshold=0.9)
+    cache.store("ns", np.array([1.0, 0.0]), "stored")
+    
+    assert cache.lookup("ns", np.array([0.95, 0.05])) == "stored"
+    assert cache.lookup("ns", np.array([0.5, 0.5])) is None
+
+
+def test_query_cache_isolates_namespaces() -> None:
+    """Test that an identical vector stored under another namespace never matches."""
+    cache: SemanticQueryCache[str] = SemanticQueryCache()
+    cache.store("RES001:a", np.array([1.0, 0.0]), "first resident")
+    
+    assert cache.lookup("RES002:a", np.array([1.0, 0.0])) is None
+    assert cache.lookup("RES001:a", np.array([1.0, 0.0])) == "first resident"
+
+
+def test_query_cache_replaces_least_recently_used() -> None:
+    """Test that a full cache evicts the entry used longest ago."""
+    cache: SemanticQueryCache[str] = SemanticQueryCache(capacity=2)
+    cache.store("ns", np.array([1.0, 0.0, 0.0]), "x")
+    cache.store("ns", np.array([0.0, 1.0, 0.0]), "y")
+    cache.lookup("ns", np.array([1.0, 0.0, 0.0]))
+    
+    cache.store("ns", np.array([0.0, 0.0, 1.0]), "z")
+    
+    assert cache.lookup("ns", np.array([1.0, 0.0, 0.0])) == "x"
+    assert cache.lookup("ns", np.array([0.0, 1.0, 0.0])) is None
+    assert cache.lookup("ns", np.array([0.0, 0.0, 1.0])) == "z"
+
+
+def test_search_cache_matches_paraphrases(clinical_notes: List[ClinicalNote]) -> None:
+    """Test that a similar query on the same notes is served from the cache."""
+    embedder = StubEmbedder({
+        "signs of depression": [1.0, 0.1],
+        "depression symptoms": [1.0, 0.15],
+        "fall risk": [0.0, 1.0]
+    })
+    cache = SemanticSearchCache(embedder.embed_query)
+    stored = make_results("signs of depression", clinical_notes)
+    cache.put("RES001", "signs of depression", clinical_notes, stored)
+    
+    assert cache.get("RES001", "depression symptoms", clinical_notes) is stored
+    assert cache.get("RES001", "fall risk", clinical_notes) is None
+    assert cache.get("RES002", "depression symptoms", clinical_notes) is None
+
+
+def test_search_cache_exact_hit_skips_embedding(
+    clinical_notes: List[ClinicalNote]
+) -> None:
+    """Test that a repeated query is answered without embedding it again."""
+    embedder = StubEmbedder({"signs of depression": [1.0, 0.0]})
+    cache = SemanticSearchCache(embedder.embed_query)
+    stored = make_results("signs of depression", clinical_notes)
+    cache.put("RES001", "signs of depression", clinical_notes, stored)
+    
+    assert cache.get("RES001", "  Signs of Depression", clinical_notes) is stored
+    assert embedder.calls == ["signs of depression"]
+
+
+def test_search_cache_reuses_embedding_from_missed_lookup(
+    clinical_notes: List[ClinicalNote]
+) -> None:
+    """Test that storing after a miss reuses the embedding computed by the lookup."""
+    embedder = StubEmbedder({"signs of depression": [1.0, 0.0]})
+    cache = SemanticSearchCache(embedder.embed_query)
+    
+    assert cache.get("RES001", "signs of depression", clinical_notes) is None
+    cache.put(
+        "RES001",
+        "signs of depression",
+        clinical_notes,
+        make_results("signs of depression", clinical_notes)
+    )
+    
+    assert embedder.calls == ["signs of depression"]
+
+
+def test_search_cache_expires_when_notes_change(
+    clinical_notes: List[ClinicalNote]
+) -> None:
+    """Test that results stored for one set of notes are not returned for another."""
+    embedder = StubEmbedder({"signs of depression": [1.0, 0.0]})
+    cache = SemanticSearchCache(embedder.embed_query)
+    cache.put(
+        "RES001",
+        "signs of depression",
+        clinical_notes,
+        make_results("signs of depression", clinical_notes)
+    )
+    new_note = ClinicalNote(
+        id="NOTE_002",
+        resident_id="RES001",
+        content="Resident smiling at lunch",
+        note_type=NoteType.CNA,
+        author=Author("Test Aide", "CNA"),
+        created_at=datetime(2024, 3, 2, 12, 0)
+    )
+    
+    assert cache.get("RES001", "signs of depression", clinical_notes + [new_note]) is None